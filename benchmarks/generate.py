@@ -0,0 +1,269 @@
+"""
+Generates synthetic Psych Engine mods for the benchmarks, with everything the converter reads:
+charts with BPM changes and events, events.json, characters with many animations, icons,
+weeks with menu characters, Lua stages with many sprites, audio, sounds, music and images.
+
+The same settings and seed always give the same mod.
+
+Usage:
+	python benchmarks/generate.py <folder> --preset medium
+	python benchmarks/generate.py <folder> --songs 10 --notes 5000 --sprites 400
+"""
+
+import argparse
+import json
+import logging
+import random
+import shutil
+import subprocess
+
+from pathlib import Path
+
+# Settings of the mods the benchmarks run on. Notes are per difficulty
+PRESETS = {
+	'small': {'songs': 2, 'difficulties': 3, 'notes': 500, 'bpmChanges': 1, 'seconds': 10,
+		'characters': 3, 'animations': 10, 'stages': 1, 'sprites': 50, 'weeks': 1, 'images': 20},
+	'medium': {'songs': 8, 'difficulties': 3, 'notes': 3000, 'bpmChanges': 3, 'seconds': 60,
+		'characters': 10, 'animations': 40, 'stages': 4, 'sprites': 300, 'weeks': 3, 'images': 200},
+	'large': {'songs': 25, 'difficulties': 3, 'notes': 10000, 'bpmChanges': 6, 'seconds': 150,
+		'characters': 30, 'animations': 80, 'stages': 10, 'sprites': 800, 'weeks': 8, 'images': 1000},
+}
+
+DIFFICULTIES = ['easy', 'normal', 'hard', 'erect', 'nightmare']
+DIRECTIONS = ['LEFT', 'DOWN', 'UP', 'RIGHT']
+
+def _json(path:Path, data):
+	path.parent.mkdir(parents=True, exist_ok=True)
+	with open(path, 'w') as f:
+		json.dump(data, f)
+
+def _bytes(path:Path, size:int, rng:random.Random):
+	path.parent.mkdir(parents=True, exist_ok=True)
+	path.write_bytes(rng.randbytes(size))
+
+def _png(path:Path, width:int, height:int, rng:random.Random):
+	from PIL import Image
+
+	path.parent.mkdir(parents=True, exist_ok=True)
+	Image.new('RGBA', (width, height), tuple(rng.randrange(256) for _ in range(4))).save(path)
+
+def _ogg(path:Path, seconds:float, frequency:int) -> bool:
+	"""
+	Writes a tone as an OGG file with ffmpeg. False if ffmpeg isn't installed.
+	"""
+	if shutil.which('ffmpeg') == None:
+		return False
+
+	path.parent.mkdir(parents=True, exist_ok=True)
+	subprocess.run(['ffmpeg', '-y', '-loglevel', 'error', '-f', 'lavfi', '-i', f'sine=frequency={frequency}:duration={seconds}',
+		'-ac', '2', '-c:a', 'libvorbis', str(path)], check=True)
+	return True
+
+def _sections(rng:random.Random, notes:int, seconds:float, bpmChanges:int) -> list:
+	# Enough 16 step sections to last `seconds`, with the BPM changing every so often
+	bpm = 150
+	sections = []
+	time = 0
+	changeEvery = None
+
+	while time < seconds * 1000 or not sections:
+		section = {'sectionNotes': [], 'mustHitSection': rng.random() < 0.5, 'lengthInSteps': 16, 'sectionBeats': 4,
+			'gfSection': False, 'altAnim': False}
+		if changeEvery != None and len(sections) % changeEvery == 0:
+			bpm = rng.choice([100, 120, 150, 175, 200])
+			section['changeBPM'] = True
+			section['bpm'] = bpm
+		section['_time'] = time
+		section['_length'] = 4 * 60000 / bpm
+		sections.append(section)
+		time += section['_length']
+
+		if changeEvery == None and bpmChanges > 0:
+			# Estimated from the first section so changes spread over the song
+			changeEvery = max(1, int(seconds * 1000 / section['_length']) // (bpmChanges + 1))
+
+	for _ in range(notes):
+		section = rng.choice(sections)
+		strumTime = section['_time'] + rng.random() * section['_length']
+		note = [strumTime, rng.randrange(8), rng.choice([0, 0, 0, rng.random() * 500])]
+		if rng.random() < 0.03:
+			note.append('Alt Animation')
+		section['sectionNotes'].append(note)
+
+		# Psych Engine charts often have stacked notes, which the converter removes
+		if rng.random() < 0.01:
+			section['sectionNotes'].append(list(note))
+
+	for section in sections:
+		section['sectionNotes'].sort(key=lambda note: note[0])
+		del section['_time']
+		del section['_length']
+
+	return sections
+
+def _events(rng:random.Random, count:int, seconds:float) -> list:
+	events = []
+	for _ in range(count):
+		stacked = []
+		for _ in range(rng.randint(1, 3)):
+			kind = rng.random()
+			if kind < 0.4:
+				stacked.append(['Play Animation', rng.choice(['hey', 'singLEFT', 'cheer']), rng.choice(['bf', 'dad', 'gf', '0', '1', 'BF'])])
+			elif kind < 0.7:
+				stacked.append(['Change Character', rng.choice(['bf', 'dad', '1', 'gf']), rng.choice(['pico', 'mom', 'spooky'])])
+			else:
+				stacked.append([rng.choice(['Camera Follow Pos', 'Add Camera Zoom', 'Hey!']), '', ''])
+		events.append([round(rng.random() * seconds * 1000, 2), stacked])
+
+	return sorted(events, key=lambda event: event[0])
+
+def _stageLua(rng:random.Random, sprites:int) -> str:
+	create = []
+	post = []
+	for i in range(sprites):
+		lines = create if rng.random() < 0.8 else post
+		tag = f'sprite{i}'
+
+		if rng.random() < 0.3:
+			lines.append(f"\tmakeAnimatedLuaSprite('{tag}', 'stage/anim{i}', {rng.randint(-2000, 2000)}, {rng.randint(-1000, 1000)})")
+			for name in ['idle', 'beat', 'shake'][:rng.randint(1, 3)]:
+				lines.append(f"\taddAnimationByPrefix('{tag}', '{name}', '{name} instance', {rng.choice([12, 24, 30])}, {rng.choice(['true', 'false'])})")
+		else:
+			lines.append(f"\tmakeLuaSprite('{tag}', 'stage/img{i}', {rng.randint(-2000, 2000)}, {rng.randint(-1000, 1000)})")
+
+		if rng.random() < 0.5:
+			lines.append(f"\tsetScrollFactor('{tag}', {round(rng.random(), 2)}, {round(rng.random(), 2)})")
+		if rng.random() < 0.5:
+			lines.append(f"\tscaleObject('{tag}', {round(0.5 + rng.random(), 2)}, {round(0.5 + rng.random(), 2)})")
+		if rng.random() < 0.3:
+			lines.append(f"\tif not lowQuality then\n\t\tsetProperty('{tag}.alpha', 0.5)\n\tend")
+		lines.append(f"\taddLuaSprite('{tag}', {'true' if rng.random() < 0.2 else 'false'})")
+
+	# Functions the converter skips, like most stage scripts have
+	update = '\n'.join(f"\tif curBeat % {i + 2} == 0 then\n\t\tplayAnim('sprite{i}', 'beat', true)\n\tend" for i in range(min(sprites, 50)))
+
+	return (f"-- Generated stage, {sprites} sprites\nlocal shakes = 0\n\nfunction onCreate()\n" + '\n'.join(create) + "\nend\n\n"
+		+ "function onCreatePost()\n" + '\n'.join(post) + "\nend\n\n"
+		+ f"function onBeatHit()\n{update}\nend\n\nfunction onUpdate(elapsed)\n\tshakes = shakes + elapsed -- end\nend\n")
+
+def generateMod(folder:str, songs:int = 2, difficulties:int = 3, notes:int = 500, bpmChanges:int = 1, seconds:float = 10,
+		characters:int = 3, animations:int = 10, stages:int = 1, sprites:int = 50, weeks:int = 1, images:int = 20,
+		audio:bool = True, seed:int = 0) -> dict:
+	"""
+	Writes a Psych Engine mod to a folder.
+
+	Args:
+		folder (str): Where the mod goes. Files already there are overwritten.
+		songs (int): Songs, each with charts, an events.json and audio.
+		difficulties (int): Charts per song, up to 5.
+		notes (int): Notes per chart.
+		bpmChanges (int): BPM changes per chart.
+		seconds (float): Length of the songs.
+		characters (int): Characters, each with an icon, assets and `animations` animations.
+		stages (int): Stages, each with a .lua of `sprites` sprites.
+		weeks (int): Weeks, each with menu characters and a title.
+		images (int): Images in the images folder, some in subfolders.
+		audio (bool): Write real OGG files with ffmpeg. Without it (or without ffmpeg) they are random bytes, which vocal split can't read.
+		seed (int): Seed of everything random.
+
+	Returns:
+		dict: What was generated, 'audio' telling if the OGG files are real.
+	"""
+	rng = random.Random(seed)
+	root = Path(folder)
+	root.mkdir(parents=True, exist_ok=True)
+
+	_json(root / 'pack.json', {'name': 'Benchmark Mod', 'description': 'Generated by benchmarks/generate.py', 'restart': False})
+	_png(root / 'pack.png', 150, 150, rng)
+	(root / 'data').mkdir(exist_ok=True)
+	(root / 'data' / 'credits.txt').write_text('Benchmark::icon::Generated::https://example.com::FFFFFF\n')
+
+	characterNames = [f'character-{i}' for i in range(characters)]
+	realAudio = audio
+
+	for i in range(songs):
+		key = f'song-{i}'
+		for difficulty in DIFFICULTIES[:difficulties]:
+			song = {
+				'song': f'Song {i}', 'bpm': 150, 'speed': round(1.5 + rng.random() * 2, 2), 'needsVoices': True,
+				'player1': 'bf', 'player2': rng.choice(characterNames or ['dad']), 'gfVersion': 'gf', 'stage': f'stage-{i % max(stages, 1)}',
+				'notes': _sections(rng, notes, seconds, bpmChanges),
+				'events': _events(rng, max(notes // 100, 1), seconds)
+			}
+			name = key if difficulty == 'normal' else f'{key}-{difficulty}'
+			_json(root / 'data' / key / f'{name}.json', {'song': song})
+
+		_json(root / 'data' / key / 'events.json', {'song': {'events': _events(rng, max(notes // 50, 1), seconds), 'notes': []}})
+
+		if realAudio:
+			realAudio = _ogg(root / 'songs' / key / 'Inst.ogg', seconds, 220 + i) and _ogg(root / 'songs' / key / 'Voices.ogg', seconds, 440 + i)
+			if not realAudio:
+				logging.warning('ffmpeg is not installed, the audio files will be random bytes')
+		if not realAudio:
+			_bytes(root / 'songs' / key / 'Inst.ogg', 64 * 1024, rng)
+			_bytes(root / 'songs' / key / 'Voices.ogg', 64 * 1024, rng)
+
+	for name in characterNames:
+		_json(root / 'characters' / f'{name}.json', {
+			'image': f'characters/{name}', 'scale': 1, 'sing_duration': 4, 'healthicon': name, 'flip_x': rng.random() < 0.5,
+			'position': [0, 0], 'camera_position': [0, 0], 'no_antialiasing': False, 'healthbar_colors': [255, 0, 0],
+			'animations': [{'anim': f'sing{DIRECTIONS[a % 4]}{"-alt" if a >= 4 else ""}{a // 8 or ""}', 'name': f'{name} anim {a}',
+				'offsets': [rng.randint(-50, 50), rng.randint(-50, 50)], 'fps': 24, 'loop': False,
+				'indices': list(range(rng.randint(0, 10)))} for a in range(animations)]
+		})
+		_bytes(root / 'images' / 'characters' / f'{name}.png', 200 * 1024, rng)
+		_bytes(root / 'images' / 'characters' / f'{name}.xml', 20 * 1024, rng)
+		_png(root / 'images' / 'icons' / f'icon-{name}.png', 300, 150, rng)
+
+	for i in range(weeks):
+		menuCharacters = []
+		for role in ['dad', 'bf', 'gf']:
+			menuName = f'menu-{role}-{i}'
+			menuCharacters.append(menuName)
+			_json(root / 'images' / 'menucharacters' / f'{menuName}.json', {'image': f'Menu_{menuName}', 'scale': 1, 'position': [0, 0],
+				'idle_anim': f'{menuName} idle', 'confirm_anim': f'{menuName} confirm' if role == 'bf' else '', 'flipX': False})
+			_bytes(root / 'images' / 'menucharacters' / f'Menu_{menuName}.png', 50 * 1024, rng)
+			_bytes(root / 'images' / 'menucharacters' / f'Menu_{menuName}.xml', 5 * 1024, rng)
+
+		weekSongs = [[f'Song {s}', rng.choice(characterNames or ['dad']), [255, 0, 0]] for s in range(i, songs, max(weeks, 1))]
+		_json(root / 'weeks' / f'week{i}.json', {'storyName': f'Week {i}', 'songs': weekSongs, 'weekCharacters': menuCharacters,
+			'weekBackground': 'stage', 'freeplayColor': [rng.randrange(256) for _ in range(3)], 'hideStoryMode': False})
+		_bytes(root / 'images' / 'storymenu' / f'week{i}.png', 10 * 1024, rng)
+
+	for i in range(stages):
+		_json(root / 'stages' / f'stage-{i}.json', {'directory': '', 'defaultZoom': 0.9, 'isPixelStage': False,
+			'boyfriend': [770, 100], 'girlfriend': [400, 130], 'opponent': [100, 100]})
+		(root / 'stages' / f'stage-{i}.lua').write_text(_stageLua(rng, sprites))
+
+	for i in range(images):
+		subfolder = f'stage/set{i % 5}/' if i % 3 else ''
+		_bytes(root / 'images' / f'{subfolder}image{i}.png', rng.randint(1, 100) * 1024, rng)
+
+	for i in range(max(images // 10, 1)):
+		_bytes(root / 'sounds' / f'sound{i}.ogg', 16 * 1024, rng)
+		_bytes(root / 'music' / f'music{i}.ogg', 64 * 1024, rng)
+
+	return {'folder': str(root), 'audio': realAudio}
+
+def main(argv:list = None):
+	parser = argparse.ArgumentParser(description='Generates a synthetic Psych Engine mod.')
+	parser.add_argument('folder', help='Where the mod goes.')
+	parser.add_argument('--preset', choices=PRESETS, default='small', help='Size of the mod, the other options change it.')
+	parser.add_argument('--seed', type=int, default=0)
+	parser.add_argument('--no-audio', action='store_true', help='Write random bytes instead of real OGG files.')
+	for key in PRESETS['small']:
+		parser.add_argument(f'--{key}', type=type(PRESETS['small'][key]), help='Defaults to the preset.')
+
+	args = parser.parse_args(argv)
+	settings = dict(PRESETS[args.preset])
+	settings.update({key: getattr(args, key) for key in settings if getattr(args, key) != None})
+
+	generated = generateMod(args.folder, audio=not args.no_audio, seed=args.seed, **settings)
+
+	print(f"Mod written to {generated['folder']}")
+	print(f"{settings['songs']} songs, {settings['difficulties']} difficulties of {settings['notes']} notes each")
+	print(f"{settings['characters']} characters, {settings['stages']} stages of {settings['sprites']} sprites, {settings['weeks']} weeks")
+	print(f"Audio: {'OGG tones' if generated['audio'] else 'random bytes, vocal split will not work on them'}")
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,249 @@
+"""
+Times full conversions of a generated mod (see generate.py), phase by phase, and writes the results as JSON.
+
+Phases come from the trace main.convert records with the 'profile' option: one per stage, the inventory and the whole conversion.
+Every span is also summed up by name, like ChartObject.convert or parseStage, to see where a stage spends its time.
+
+Usage:
+	python benchmarks/run.py --preset medium --repeat 3
+	python benchmarks/run.py --mod <psych mod> -- --workers 4 --worker-kind process
+	python benchmarks/run.py --preset small --baseline benchmarks/results/small-old.json --fail-above 10
+
+Everything after -- is passed to `psychtobase convert`, which runs with --all --no-cache unless told otherwise.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# main.py and src/ import each other as top-level modules, like in psychtobase/__main__.py
+sys.path.insert(0, str(ROOT / 'psychtobase'))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from src import Constants, cli, log
+import generate
+import main as porter
+
+def _gitCommit() -> str:
+	try:
+		return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+	except (OSError, subprocess.CalledProcessError):
+		return None
+
+def _peakMemory() -> int:
+	# Kilobytes on Linux, bytes on macOS, not available on Windows
+	try:
+		import resource
+	except ImportError:
+		return None
+	return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def _folderSize(folder:Path) -> tuple:
+	files = [path for path in folder.rglob('*') if path.is_file()]
+	return len(files), sum(path.stat().st_size for path in files)
+
+def readTrace(file:str) -> tuple:
+	"""
+	Sums up the spans of a trace.
+
+	Args:
+		file (str): Trace written by main.convert with the 'profile' option.
+
+	Returns:
+		tuple: Milliseconds of every phase (stages, inventory and the whole conversion),
+			and {name: {'count', 'ms'}} of every span.
+	"""
+	with open(file) as f:
+		events = json.load(f)['traceEvents']
+
+	phases = {}
+	spans = {}
+	for event in events:
+		if event.get('ph') != 'X':
+			continue
+
+		ms = event['dur'] / 1000
+		name = event['name']
+		if event['cat'] == 'stage' or name in ['inventory', 'conversion']:
+			phases[name] = phases.get(name, 0) + ms
+
+		total = spans.setdefault(name, {'count': 0, 'ms': 0})
+		total['count'] += 1
+		total['ms'] += ms
+
+	return phases, spans
+
+def runOnce(mod:str, arguments:list, workFolder:Path, run:int) -> dict:
+	"""
+	Converts the mod into a new folder, with a trace to read the phases from.
+	Runs share this process, but nothing carries over: main.convert forgets the parsed stage scripts, and --no-cache skips the conversion cache.
+
+	Args:
+		mod (str): Psych Engine mod to convert.
+		arguments (list): Command line arguments of `psychtobase convert`, without the mod and output.
+		workFolder (Path): Where the output and trace go.
+		run (int): Number of the run, naming its output.
+	"""
+	output = workFolder / f'output-{run}'
+	traceFile = workFolder / f'trace-{run}.json'
+
+	args = cli.buildParser().parse_args(['convert', mod, str(output), *arguments])
+	options = cli.buildOptions(args)
+	options['profile'] = str(traceFile)
+
+	begin = time.perf_counter()
+	finished = porter.convert(mod, str(output), options)
+	seconds = time.perf_counter() - begin
+
+	phases, spans = readTrace(traceFile)
+	files, size = _folderSize(output)
+	shutil.rmtree(output, ignore_errors=True)
+
+	return {
+		'seconds': seconds,
+		'finished': finished,
+		'phases': phases,
+		'spans': spans,
+		'outputFiles': files,
+		'outputBytes': size
+	}
+
+def summarize(runs:list) -> dict:
+	"""
+	Medians of the runs: wall time and every phase in milliseconds.
+	"""
+	phases = sorted({name for run in runs for name in run['phases']})
+	summary = {'seconds': statistics.median(run['seconds'] for run in runs), 'phases': {}}
+	for name in phases:
+		summary['phases'][name] = statistics.median(run['phases'].get(name, 0) for run in runs)
+	return summary
+
+def compare(summary:dict, baselineFile:str) -> dict:
+	"""
+	Change of every phase against an earlier results file, in percent. Phases it doesn't have are left out.
+	"""
+	with open(baselineFile) as f:
+		baseline = json.load(f)['summary']
+
+	changes = {}
+	for name, ms in summary['phases'].items():
+		before = baseline['phases'].get(name)
+		if before:
+			changes[name] = (ms - before) / before * 100
+	return changes
+
+def main(argv:list = None) -> int:
+	argv = sys.argv[1:] if argv == None else argv
+	# Arguments after -- go to the converter
+	arguments = []
+	if '--' in argv:
+		split = argv.index('--')
+		argv, arguments = argv[:split], argv[split + 1:]
+
+	parser = argparse.ArgumentParser(description='Times full conversions of a generated mod.')
+	parser.add_argument('--preset', choices=generate.PRESETS, default='small', help='Size of the generated mod.')
+	parser.add_argument('--seed', type=int, default=0)
+	parser.add_argument('--mod', help='Convert this mod instead of generating one.')
+	parser.add_argument('--keep-mod', metavar='FOLDER', help='Generate the mod into FOLDER and keep it.')
+	parser.add_argument('--repeat', type=int, default=3, metavar='N', help='How many times the mod is converted. Phases are the median of the runs.')
+	parser.add_argument('--warmup', type=int, default=1, metavar='N', help='Conversions run first and left out of the results, the first one pays for imports and cold disk caches.')
+	parser.add_argument('--split', action='store_true', help='Also split the vocals. Needs ffmpeg.')
+	parser.add_argument('--output', metavar='FILE', help='Where the results go, defaults to benchmarks/results/<preset>-<date>.json.')
+	parser.add_argument('--baseline', metavar='FILE', help='Results file to compare against.')
+	parser.add_argument('--fail-above', type=float, metavar='PERCENT', help='Exit with 1 if a phase got slower than this against the baseline.')
+	parser.add_argument('--log', action='store_true', help='Log the conversions to logs/ and the console, like the command line does.')
+	args = parser.parse_args(argv)
+
+	if args.fail_above != None and not args.baseline:
+		parser.error('--fail-above needs --baseline')
+
+	if args.log:
+		log.setup(gui=False)
+	else:
+		logging.basicConfig(level=logging.WARNING, format='[%(levelname)s] %(message)s')
+
+	if not arguments:
+		arguments = ['--all', '--no-cache']
+	if args.split:
+		arguments.append('--split')
+
+	results = {
+		'version': Constants.VERSION,
+		'commit': _gitCommit(),
+		'python': platform.python_version(),
+		'platform': platform.platform(),
+		'cpus': os.cpu_count(),
+		'arguments': arguments,
+		'warmup': args.warmup,
+		'date': time.strftime('%Y-%m-%d %H:%M:%S')
+	}
+
+	with tempfile.TemporaryDirectory(prefix='fnf-porter-bench-') as workFolder:
+		workFolder = Path(workFolder)
+		mod = args.mod
+
+		if mod == None:
+			settings = generate.PRESETS[args.preset]
+			# The mod folder name is the name of the converted mod
+			folder = Path(args.keep_mod) if args.keep_mod else workFolder / 'benchmark-mod'
+
+			begin = time.perf_counter()
+			generated = generate.generateMod(str(folder), audio=args.split, seed=args.seed, **settings)
+			results['generate'] = {'preset': args.preset, 'seed': args.seed, 'settings': settings,
+				'seconds': time.perf_counter() - begin, 'audio': generated['audio']}
+			mod = str(folder)
+
+			if args.split and not generated['audio']:
+				logging.warning('ffmpeg is not installed, vocal split will fail on the generated audio')
+
+		results['mod'] = mod
+		for run in range(args.warmup):
+			runOnce(mod, arguments, workFolder, -1 - run)
+
+		results['runs'] = []
+		for run in range(args.repeat):
+			result = runOnce(mod, arguments, workFolder, run)
+			results['runs'].append(result)
+			print(f"Run {run + 1}/{args.repeat}: {result['seconds']:.2f}s")
+
+	results['peakMemory'] = _peakMemory()
+	results['summary'] = summarize(results['runs'])
+
+	print(f"\n{'Phase':<20}{'Median ms':>12}")
+	for name, ms in sorted(results['summary']['phases'].items(), key=lambda phase: -phase[1]):
+		print(f'{name:<20}{ms:>12.1f}')
+
+	status = 0
+	if args.baseline:
+		results['baseline'] = args.baseline
+		results['changes'] = compare(results['summary'], args.baseline)
+
+		print(f"\n{'Phase':<20}{'Change':>12}")
+		for name, change in results['changes'].items():
+			print(f'{name:<20}{change:>+11.1f}%')
+			if args.fail_above != None and change > args.fail_above:
+				status = 1
+
+	output = Path(args.output) if args.output else Path(__file__).resolve().parent / 'results' / f"{args.preset if args.mod == None else Path(args.mod).name}-{time.strftime('%Y-%m-%d_%H-%M-%S')}.json"
+	output.parent.mkdir(parents=True, exist_ok=True)
+	with open(output, 'w') as f:
+		json.dump(results, f, indent=4)
+	print(f'\nResults written to {output}')
+
+	if status:
+		print(f'A phase got more than {args.fail_above}% slower')
+	return status
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -4,3 +4,5 @@ pip install pydub
 pip install luaparser
 pip install pyqt6
 pip install pillow
+pip install orjson
+pip install ijson
@@ -0,0 +1,13 @@
+"""Entry point for `python -m psychtobase`. See src/cli.py for the available commands."""
+
+import sys
+
+from pathlib import Path
+
+# main.py and src/ import each other as top-level modules
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from src import cli
+
+if __name__ == '__main__':
+    sys.exit(cli.main())
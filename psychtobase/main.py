@@ -1,31 +1,32 @@
-import json
 import logging
-import shutil
-import threading
+import multiprocessing
 import time
 
 from base64 import b64decode
 from pathlib import Path
 from PIL import Image
 
-from src import Constants, FileContents, files, log, Utils, window
+from src import Constants, FileContents, files, jsonio, log, progress, scheduler, tracing, Utils
+from src.cache import ConversionCache
 
 from src.tools import StageLuaParse, StageTool, VocalSplit, WeekTools
 from src.tools import ModConvertTools as ModTools
 
 from src.tools.CharacterTools import CharacterObject
-from src.tools.ChartTools import ChartObject 
+from src.tools.ChartTools import convertChart
 
 if __name__ == '__main__':
+    # Process pools need this in frozen builds
+    multiprocessing.freeze_support()
+
     log.setup()
+
+    # The window is only needed for the GUI, the command line never imports it
+    from src import window
     window.init()
 
 # Main
 
-charts = []
-characterMap = {
-    # 'charactr': 'Name In English'
-}
 vocalSplitMasterToggle = True
 
 def folderMake(folder_path:str):
@@ -43,9 +44,10 @@ def folderMake(folder_path:str):
     else:
         logging.warn(f'{folder_path} already exists!')
 
+@tracing.traced('copy', 'source')
 def fileCopy(source, destination):
     """
-    Copies a file to a destination
+    Copies a file to a destination, with the mode set in the 'copy' options.
     
     Args:
         source (str): Path to the file.
@@ -53,820 +55,991 @@ def fileCopy(source, destination):
     """
     if Path(source).exists():
         try:
-            shutil.copyfile(source, destination)
+            files.copyFile(source, destination)
         except Exception as e:
             logging.error(f'Something went wrong: {e}')
     else:
         logging.warn(f'Path {source} doesn\'t exist.')
 
-def treeCopy(source, destination):
+@tracing.traced('copy', 'source')
+def treeCopy(source, destination, inventory:files.ModInventory = None):
     """
-    Copies a folder to a destination
+    Copies a folder to a destination, merging it with the folder already there.
     
     Args:
         source (str): Path to the folder.
         destination (str): Path to where the folder should go.
+        inventory (files.ModInventory): Inventory of the mod, the folder's files are listed from it.
     """
-    if not Path(destination).exists() and Path(source).exists():
+    if Path(source).exists():
         try:
-            shutil.copytree(source, destination)
+            counts = files.copyTree(source, destination, inventory=inventory)
+            logging.info(f'Copied {source}: {", ".join(f"{count} {done}" for done, count in counts.items()) or "empty"}')
         except Exception as e:
             logging.error(f'Something went wrong: {e}')
-    elif not Path(source).exists():
+    else:
         logging.warn(f'Path {source} does not exist.')
 
-def convert(psych_mod_folder, result_folder, options):
+def setupStage(context):
     """
-    Converts a mod.
-    
-    Args:
-        psych_mod_folder (str): Path to the Psych Engine mod folder.
-        result_folder (str): Path to the Base Game 'mods' folder.
-        options (dict): Set of options chosen by the user.
+    Applies the options every stage needs, on whichever thread or process the stage runs.
     """
+    files.configureCopy(context['options'].get('copy'))
+    jsonio.configure(context['options'].get('compact', False))
+    log.enableTrace(context['options'].get('trace', False))
 
-    # Logs the time at which the conversion began.
-    runtime = time.time()
+def _paths(context):
+    return context['modName'], context['modFoldername'], context['resultFolder']
 
-    # Announces a large string of text indicating the conversion has began.
-    logging.info(Utils.coolText("NEW CONVERSION STARTED"))
-    logging.info(options)
+def _cache(context, stage, writesJson = True):
+    options = context['options']
+    # JSON outputs have to be written again when their formatting changes
+    settings = [options.get('compact', False)] if writesJson else []
+    return ConversionCache(context['resultFolder'], context['modFoldername'], stage, options.get('cache', True), context['inventory'], settings)
 
-    # Variable used to refer to the mod folder path.
-    modName = psych_mod_folder
+def convertPackMeta(context, results):
+    """
+    Converts pack.json, pack.png and credits.txt.
+    """
+    modName, modFoldername, result_folder = _paths(context)
+    inventory = context['inventory']
 
-    # Variable used to refer to the name of the mod folder.
-    modFoldername = Path(psych_mod_folder).name
+    logging.info('Converting pack.json')
 
-    logging.info(f'Converting from{psych_mod_folder} to {result_folder}')
+    # Accesses the paths of the pack.json file
+    dir = Constants.FILE_LOCS.get('PACKJSON')
+    psychPackJson = dir[0]
+    polymodMetaDir = dir[1]
 
-    # Accesses the options to see if the user selected modpack metadata
-    if options.get('modpack_meta', False):
-        logging.info('Converting pack.json')
+    # Checks if the pack.json file exists
+    if inventory.exists(f'{modName}{psychPackJson}'):
 
-        # Accesses the paths of the pack.json file
-        dir = Constants.FILE_LOCS.get('PACKJSON')
-        psychPackJson = dir[0]
-        polymodMetaDir = dir[1]
-        
-        # Checks if the pack.json file exists
-        if Path(f'{modName}{psychPackJson}').exists():
+        # Try except to avoid errors
+        try:
 
-            # Try except to avoid errors
-            try:
+            # Reads the file and converts it to a valid _polymod_meta.json file
+            polymod_meta = ModTools.convertPack(jsonio.load(f'{modName}{psychPackJson}'))
 
-                # Reads the file and converts it to a valid _polymod_meta.json file
-                polymod_meta = ModTools.convertPack(json.loads(open(f'{modName}{psychPackJson}', 'r').read()))
+            # Makes sure the folder to which the file will be written to is valid
+            folderMake(f'{result_folder}/{modFoldername}/')
 
-                # Makes sure the folder to which the file will be written to is valid
-                folderMake(f'{result_folder}/{modFoldername}/')
+            # Writes the file to the path
+            jsonio.dump(polymod_meta, f'{result_folder}/{modFoldername}/{polymodMetaDir}', indent=4)
+        except Exception as e:
+            logging.error('Couldn\'t convert pack.json file')
 
-                # Writes the file to the path
-                open(f'{result_folder}/{modFoldername}/{polymodMetaDir}', 'w').write(json.dumps(polymod_meta, indent=4))
-            except Exception as e:
-                logging.error('Couldn\'t convert pack.json file')
+        logging.info('pack.json converted and saved')
+    else:
+        # If the file does not exist, write a default one as it is necessary
 
-            logging.info('pack.json converted and saved')
-        else:
-            # If the file does not exist, write a default one as it is necessary
+        # Makes sure the folder to which the file will be written to is valid
+        folderMake(f'{result_folder}/{modFoldername}/')
 
-            # Makes sure the folder to which the file will be written to is valid
-            folderMake(f'{result_folder}/{modFoldername}/')
+        # Writes a default file to the path
+        jsonio.dump(ModTools.defaultPolymodMeta(), f'{result_folder}/{modFoldername}/{polymodMetaDir}', indent=4)
+        logging.warn('pack.json not found. Replaced it with default')
 
-            # Writes a default file to the path
-            open(f'{result_folder}/{modFoldername}/{polymodMetaDir}', 'w').write(json.dumps(ModTools.defaultPolymodMeta(), indent=4))
-            logging.warn('pack.json not found. Replaced it with default')
+    logging.info('Copying pack.png')
 
-        logging.info('Copying pack.png')
+    # Accesses the paths to the pack.png file
+    dir = Constants.FILE_LOCS.get('PACKPNG')
+    psychPackPng = dir[0]
+    polymodIcon = dir[1]
 
-        # Accesses the paths to the pack.png file
-        dir = Constants.FILE_LOCS.get('PACKPNG')
-        psychPackPng = dir[0]
-        polymodIcon = dir[1]
-        
-        # Checks if the path to it exists
-        if Path(f'{modName}{psychPackPng}').exists():
+    # Checks if the path to it exists
+    if inventory.exists(f'{modName}{psychPackPng}'):
 
-            # Makes sure the folder to which the file will be written to is valid
-            folderMake(f'{result_folder}/{modFoldername}/')
+        # Makes sure the folder to which the file will be written to is valid
+        folderMake(f'{result_folder}/{modFoldername}/')
 
-            # Try except to avoid any errors
-            try:
-                # Copy the png file to the path
-                fileCopy(f'{modName}{psychPackPng}', f'{result_folder}/{modFoldername}/{polymodIcon}')
-            except Exception as e:
-                logging.error(f'Could not copy pack.png file: {e}')
-        else:
-            # If the file does not exist, replace it with a default one
-            logging.warn('pack.png not found. Replacing it with default')
-            try:
-                # Generate the path to write it to
-                polymodIconpath = f'{result_folder}/{modFoldername}/{polymodIcon}'
-                with open(polymodIconpath, 'wb') as output_file:
-                    # Write the default png file
-                    output_file.write(b64decode(Constants.BASE64_IMAGES.get('missingModImage')))
-            except Exception as e:
-                logging.error(f'Could not write default file: {e}')
+        # Try except to avoid any errors
+        try:
+            # Copy the png file to the path
+            fileCopy(f'{modName}{psychPackPng}', f'{result_folder}/{modFoldername}/{polymodIcon}')
+        except Exception as e:
+            logging.error(f'Could not copy pack.png file: {e}')
+    else:
+        # If the file does not exist, replace it with a default one
+        logging.warn('pack.png not found. Replacing it with default')
+        try:
+            # Generate the path to write it to
+            polymodIconpath = f'{result_folder}/{modFoldername}/{polymodIcon}'
+            with open(polymodIconpath, 'wb') as output_file:
+                # Write the default png file
+                output_file.write(b64decode(Constants.BASE64_IMAGES.get('missingModImage')))
+        except Exception as e:
+            logging.error(f'Could not write default file: {e}')
 
-        logging.info('Parsing and converting credits.txt')
+    logging.info('Parsing and converting credits.txt')
 
-        # Accesses the path to the credits.txt
-        dir = Constants.FILE_LOCS.get('CREDITSTXT')
+    # Accesses the path to the credits.txt
+    dir = Constants.FILE_LOCS.get('CREDITSTXT')
 
-        psychCredits = dir[0]
-        modCredits = dir[1]
+    psychCredits = dir[0]
+    modCredits = dir[1]
 
-        # Makes sure the path to it exists
-        if Path(f'{modName}{psychCredits}').exists():
-            # Ensures the folder is valid
-            folderMake(f'{result_folder}/{modFoldername}/')
+    # Makes sure the path to it exists
+    if inventory.exists(f'{modName}{psychCredits}'):
+        # Ensures the folder is valid
+        folderMake(f'{result_folder}/{modFoldername}/')
 
-            # Parses the file by opening it
-            resultCredits = ModTools.convertCredits(open(f'{modName}{psychCredits}', 'r').read())
+        # Parses the file by opening it
+        resultCredits = ModTools.convertCredits(open(f'{modName}{psychCredits}', 'r').read())
 
-            # Writes the text content to a new file
-            open(f'{result_folder}/{modFoldername}/{modCredits}', 'w').write(resultCredits)
-        else:
-            logging.warn(f'Could not find {modName}{psychCredits}')
+        # Writes the text content to a new file
+        open(f'{result_folder}/{modFoldername}/{modCredits}', 'w').write(resultCredits)
+    else:
+        logging.warn(f'Could not find {modName}{psychCredits}')
 
-    # Accesses the chart options selected by the user
-    chartOptions = options.get('charts', {
-        'songs': False,
-        'events':False
-    })
-    if chartOptions['songs']:
+def convertCharts(context, results):
+    """
+    Converts every chart in the mod. Returns the chart entries later used by vocal split.
+    """
+    modName, modFoldername, result_folder = _paths(context)
+    inventory = context['inventory']
+    chartOptions = context['options']['charts']
 
-        # Gets the path to the charts folder
-        chartFolder = Constants.FILE_LOCS.get('CHARTFOLDER')
-        psychChartFolder = modName + chartFolder[0]
+    # Gets the path to the charts folder
+    chartFolder = Constants.FILE_LOCS.get('CHARTFOLDER')
+    psychChartFolder = modName + chartFolder[0]
 
-        # Ensures the new chart folder exists
-        folderMake(f'{result_folder}/{modFoldername}{chartFolder[1]}')
+    # Ensures the new chart folder exists
+    folderMake(f'{result_folder}/{modFoldername}{chartFolder[1]}')
 
-        # Finds all the chart directories
-        songs = files.findAll(f'{psychChartFolder}*')
+    # Finds all the chart directories
+    songs = inventory.findAll(f'{psychChartFolder}*')
 
-        # Iterates through them
-        for song in songs:
+    outputpath = f'{result_folder}/{modFoldername}'
 
-            # Checks if they are valid directories
-            if Path(song).is_dir():
-                logging.info(f'Loading charts in {song}')
+    # Only directories hold charts. Sorted so the entries come back in the same order every run
+    songs = sorted(song for song in songs if inventory.isDir(song))
 
-                outputpath = f'{result_folder}/{modFoldername}'
+    cache = _cache(context, 'charts')
+    fingerprints = {song: cache.fingerprint(inventory.findAll(f'{song}/*.json'), chartOptions['events']) for song in songs}
 
-                # Opens a new ChartObject instance with the chart's path, output path, and if it should convert events.
-                # Try except to avoid any crash
-                try:
-                    songChart = ChartObject(song, outputpath, chartOptions['events'])
-                except FileNotFoundError:
-                    # If the charts arent found, this error will be thrown.
-                    logging.warning(f"{song} data not found! Skipping...")
-                    continue
-                except Exception as e:
-                    # If any other Exception is found, throw a error
-                    logging.error("Error creating ChartObject instance: " + str(e))
-                    continue
-                else:
-                    logging.info(f'{song} successfully initialized! Converting')
+    # Songs whose charts didn't change since the last run are only read back from the cache
+    cached = {}
+    for song in songs:
+        entry = cache.get(song, fingerprints[song])
+        if entry != None:
+            logging.info(f'{song} did not change since the last conversion, skipping')
+            cached[song] = entry['result']
 
-                # Converts the chart inside the chart instance
-                songChart.convert()
+    jobs = [(song, outputpath, chartOptions['events'], context['options'].get('compact', False), chartOptions.get('stream', False),
+        chartOptions.get('vectorize', True)) for song in songs if song not in cached]
 
-                # Appens the chart to the charts map, to later be used by vocal split
-                # Try except to avoid any crash
-                try:
-                    charts.append({
-                        'songKey': songChart.songFile,
-                        'sections': songChart.sections,
-                        'bpm': songChart.startingBpm,
-                        'player': songChart.metadata['playData']['characters']['player'],
-                        'opponent': songChart.metadata['playData']['characters']['opponent']
-                    })
-                except Exception as e:
-                    logging.error(f'Could not create a chart entry for a chart: {e}')
+    workers = chartOptions.get('jobs', 1)
+    if workers > 1 and len(jobs) > 1:
+        # Every song is converted and saved on its own process, only the vocal split entry comes back
+        logging.info(f'Converting {len(jobs)} songs on {workers} processes')
+        pool = scheduler.makePool(workers, 'process')
+        try:
+            converted = list(progress.each(pool.map(convertChart, *zip(*jobs)), len(jobs)))
+        finally:
+            # Songs that didn't start yet are dropped if the conversion was cancelled
+            pool.shutdown(cancel_futures=True)
+    else:
+        converted = [convertChart(*job) for job in progress.each(jobs)]
 
-                logging.info(f'{song} charts converted, saving')
+    for (song, *_), (entry, outputs) in zip(jobs, converted):
+        if entry != None:
+            cache.put(song, fingerprints[song], outputs, entry)
+            cached[song] = entry
 
-                # Saves the chart in the ChartObject instance
-                # Try except to avoid any crashes
-                try:
-                    songChart.save()
-                except Exception as e:
-                    logging.error(f'Could not save chart: {e}')
+    cache.save()
 
-    # Accesses if the user selected the events
-    if chartOptions['events']:
+    # Chart entries, to later be used by vocal split
+    return [cached[song] for song in songs if cached.get(song) != None]
 
-        # Accesses the scripts directory
-        _pathsModRoot = Constants.FILE_LOCS.get('SCRIPTS_DIR')
-        baseGameModRoot = _pathsModRoot[1]
+def writeEventScripts(context, results):
+    """
+    Writes the scripts needed by converted events.
+    """
+    modName, modFoldername, result_folder = _paths(context)
 
-        # Try except to avoid any errors
-        try:
-            # Creates the folder where the scripts should go
-            folderMake(f'{result_folder}/{modFoldername}{baseGameModRoot}')
+    # Accesses the scripts directory
+    _pathsModRoot = Constants.FILE_LOCS.get('SCRIPTS_DIR')
+    baseGameModRoot = _pathsModRoot[1]
 
-            # Writes neccessary scripts to the folder
-            with open(f'{result_folder}/{modFoldername}{baseGameModRoot}{FileContents.CHANGE_CHARACTER_EVENT_HXC_NAME}', 'w') as scriptFile:
-                scriptFile.write(FileContents.CHANGE_CHARACTER_EVENT_HXC_CONTENTS)
-        except Exception as e:
-            logging.error("Failed creating the scripts folder: " + e)
+    # Try except to avoid any errors
+    try:
+        # Creates the folder where the scripts should go
+        folderMake(f'{result_folder}/{modFoldername}{baseGameModRoot}')
 
-    # Accesses the character options selected by the user.
-    if options.get('characters', {
-            'assets': False
-        })['assets']:
-        logging.info('Copying character assets...')
+        # Writes neccessary scripts to the folder
+        with open(f'{result_folder}/{modFoldername}{baseGameModRoot}{FileContents.CHANGE_CHARACTER_EVENT_HXC_NAME}', 'w') as scriptFile:
+            scriptFile.write(FileContents.CHANGE_CHARACTER_EVENT_HXC_CONTENTS)
+    except Exception as e:
+        logging.error("Failed creating the scripts folder: " + e)
 
-        # Reads the path where the assets for characters are
-        dir = Constants.FILE_LOCS.get('CHARACTERASSETS')
-        psychCharacterAssets = modName + dir[0]
-        bgCharacterAssets = dir[1]
+def copyCharacterAssets(context, results):
+    """
+    Copies character spritesheets.
+    """
+    modName, modFoldername, result_folder = _paths(context)
+    inventory = context['inventory']
 
-        # Creates the folder for character assets
-        folderMake(f'{result_folder}/{modFoldername}{bgCharacterAssets}')
+    logging.info('Copying character assets...')
 
-        # Reads through all files in the character assets folder of Psych Engine
-        for character in files.findAll(f'{psychCharacterAssets}*'):
+    # Reads the path where the assets for characters are
+    dir = Constants.FILE_LOCS.get('CHARACTERASSETS')
+    psychCharacterAssets = modName + dir[0]
+    bgCharacterAssets = dir[1]
 
-            # Checks if the file is a file
-            if Path(character).is_file():
-                logging.info(f'Copying asset {character}')
+    # Creates the folder for character assets
+    folderMake(f'{result_folder}/{modFoldername}{bgCharacterAssets}')
 
-                # Copies it
-                # Try except to avoid any errors
-                try:
-                    fileCopy(character, result_folder + f'/{modFoldername}' + bgCharacterAssets + Path(character).name)
-                except Exception as e:
-                    logging.error(f'Could not copy asset {character}: {e}')
-            else:
-                logging.warn(f'{character} is a directory, not a file! Skipped')
+    # Reads through all files in the character assets folder of Psych Engine
+    for character in progress.each(inventory.findAll(f'{psychCharacterAssets}*')):
+
+        # Checks if the file is a file
+        if inventory.isFile(character):
+            logging.info(f'Copying asset {character}')
+
+            # Copies it
+            # Try except to avoid any errors
+            try:
+                fileCopy(character, result_folder + f'/{modFoldername}' + bgCharacterAssets + Path(character).name)
+            except Exception as e:
+                logging.error(f'Could not copy asset {character}: {e}')
+        else:
+            logging.warn(f'{character} is a directory, not a file! Skipped')
+
+def convertCharacterJsons(context, results):
+    """
+    Converts character jsons. Returns the character map used by freeplay icons.
+    """
+    modName, modFoldername, result_folder = _paths(context)
+    inventory = context['inventory']
+    characterMap = {
+        # 'charactr': 'Name In English'
+    }
 
-    # Accesses the character options selected by the user.
-    if options.get('characters', {
-            'json': False
-        })['json']:
+    logging.info('Converting character jsons...')
 
-        logging.info('Converting character jsons...')
+    # Gets where character data should go
+    dir = Constants.FILE_LOCS.get('CHARACTERJSONS')
 
-        # Gets where character data should go
-        dir = Constants.FILE_LOCS.get('CHARACTERJSONS')
+    psychCharacters = modName + dir[0]
+    bgCharacters = dir[1]
 
-        psychCharacters = modName + dir[0]
-        bgCharacters = dir[1]
+    # Creates the folder where the character assets should go
+    folderMake(f'{result_folder}/{modFoldername}{bgCharacters}')
 
-        # Creates the folder where the character assets should go
-        folderMake(f'{result_folder}/{modFoldername}{bgCharacters}')
+    cache = _cache(context, 'characterJsons')
 
-        # Finds all the files in the character data folder
-        for character in files.findAll(f'{psychCharacters}*'):
-            logging.info(f'Checking if {character} is a file...')
-            
-            # Checks if it ends with .json
-            if Path(character).is_file() and character.endswith('.json'):
+    # Finds all the files in the character data folder
+    for character in progress.each(inventory.findAll(f'{psychCharacters}*')):
+        logging.info(f'Checking if {character} is a file...')
 
-                # Creates a character object instance
-                try:
+        # Checks if it ends with .json
+        if inventory.isFile(character) and character.endswith('.json'):
+
+            # Creates a character object instance
+            try:
+                fingerprint = cache.fingerprint([character])
+                entry = cache.get(character, fingerprint)
+
+                if entry != None:
+                    logging.info(f'{character} did not change since the last conversion, skipping')
+                    iconID, characterName = entry['result']
+                else:
                     converted_char = CharacterObject(character, result_folder + f'/{modFoldername}' + bgCharacters)
 
                     converted_char.convert()
-                    converted_char.save()
+                    output = converted_char.save()
 
-                    # Ensures the character icon ID does not have 'icon-'
-                    fileBasename = converted_char.iconID.replace('icon-', '')
+                    iconID, characterName = converted_char.iconID, converted_char.characterName
+                    cache.put(character, fingerprint, [output], [iconID, characterName])
 
-                    # Checks if the icon ID exists in the character map
-                    if fileBasename in characterMap:
+                # Ensures the character icon ID does not have 'icon-'
+                fileBasename = iconID.replace('icon-', '')
 
-                        # Appends it to the array of character names
-                        characterMap[fileBasename].append(converted_char.characterName)
-                    else:
-                        # If it doesnt exist, create a new array
-                        characterMap[fileBasename] = [converted_char.characterName]
-                    logging.info(f'Saved {converted_char.characterName} to character map using their icon id: {fileBasename}.')
-                except Exception as e:
-                    logging.error(f'Failed to convert character {character}')
-            else:
-                logging.warn(f'{character} is a directory, or not a json! Skipped')
+                # Checks if the icon ID exists in the character map
+                if fileBasename in characterMap:
 
-    # Accesses the character options selected by the user.
-    if options.get('characters', {
-        'icons': False
-    })['icons']:
-        logging.info('Copying character icons...')
+                    # Appends it to the array of character names
+                    characterMap[fileBasename].append(characterName)
+                else:
+                    # If it doesnt exist, create a new array
+                    characterMap[fileBasename] = [characterName]
+                logging.info(f'Saved {characterName} to character map using their icon id: {fileBasename}.')
+            except Exception as e:
+                logging.error(f'Failed to convert character {character}')
+        else:
+            logging.warn(f'{character} is a directory, or not a json! Skipped')
 
-        # Selects the paths to the character icons
-        dir = Constants.FILE_LOCS.get('CHARACTERICON')
-        psychCharacterAssets = modName + dir[0]
-        bgCharacterAssets = dir[1]
+    cache.save()
 
-        # Selects the paths to the freeplay icons
-        freeplayDir = Constants.FILE_LOCS.get('FREEPLAYICON')[1]
+    return characterMap
 
-        # Creates both necessary directories
-        folderMake(f'{result_folder}/{modFoldername}{bgCharacterAssets}')
-        folderMake(f'{result_folder}/{modFoldername}{freeplayDir}')
+def copyCharacterIcons(context, results):
+    """
+    Copies health icons and generates freeplay icons for converted characters.
+    """
+    modName, modFoldername, result_folder = _paths(context)
+    inventory = context['inventory']
+    characterMap = results.get('characterJsons') or {}
 
-        # Finds all png files in the mod icons directory
-        for character in files.findAll(f'{psychCharacterAssets}*.png'):
-            # Checks if the character is a file
-            if Path(character).is_file():
-                logging.info(f'Copying asset {character}')
+    logging.info('Copying character icons...')
 
-                # Try except to avoid any errors
-                try:
-                    filename = Path(character).name
-                    # Some goofy ah mods don't name icons with icon-, causing them to be invalid in base game.
-                    if not filename.startswith('icon-'):
-                        logging.warn(f"Invalid icon name being renamed from '{filename}' to 'icon-{filename}'!")
-                        filename = 'icon-' + filename
-                    
-                    destination = f'{result_folder}/{modFoldername}{bgCharacterAssets}{filename}'
-                    # Copies the icon over
-                    fileCopy(character, destination)
-
-                    # Part 2, generating free play icons.
-                    keyForThisIcon = filename.replace('icon-', '').replace('.png', '')
-                    logging.info('Checking if ' + keyForThisIcon + ' is in the characterMap')
-
-                    # Checks if the icon ID exists in the character map
-                    if keyForThisIcon in characterMap:
+    # Selects the paths to the character icons
+    dir = Constants.FILE_LOCS.get('CHARACTERICON')
+    psychCharacterAssets = modName + dir[0]
+    bgCharacterAssets = dir[1]
 
-                        # Try except to avoid any errors
-                        try:
-                            # Woah, freeplay icons
-
-                            # Makes PIL shut up in our logs
-                            logging.getLogger('PIL').setLevel(logging.INFO)
-
-                            # Opens the icon with Image module
-                            with Image.open(character) as img:
-                                # Get the winning/normal half of icons
-                                normal_half = img.crop((0, 0, 150, 150))
-                                # Scale to 50x50, same size as BF and GF pixel icons
-                                pixel_img = normal_half.resize((50, 50), Image.Resampling.NEAREST)
-
-                                # Checks for every character assigned to this icon ID
-                                for characterName in characterMap[keyForThisIcon]:
-
-                                    # Defines the name of the file
-                                    pixel_name = characterName + 'pixel.png'
-                                    freeplay_destination = f'{result_folder}/{modFoldername}{freeplayDir}/{pixel_name}'
-
-                                    # Saves the icon
-                                    pixel_img.save(freeplay_destination)
-                                    logging.info(f'Saving converted freeplay icon to {freeplay_destination}')
-                        except Exception as ___exc:
-                            logging.error(f"Failed to create character {keyForThisIcon}'s freeplay icon: {___exc}")
-                except Exception as e:
-                    logging.error(f'Could not copy asset {character}: {e}')
+    # Selects the paths to the freeplay icons
+    freeplayDir = Constants.FILE_LOCS.get('FREEPLAYICON')[1]
 
-    # Accesses the song options selected by the user.
-    songOptions = options.get('songs', {
-        'inst': False,
-        'voices': False,
-        'split': False,
-        'sounds': False,
-        'music': False
-    })
-    if songOptions:
+    # Creates both necessary directories
+    folderMake(f'{result_folder}/{modFoldername}{bgCharacterAssets}')
+    folderMake(f'{result_folder}/{modFoldername}{freeplayDir}')
 
-        # Opens the directory for songs folders
-        dir = Constants.FILE_LOCS.get('SONGS')
-        psychSongs = modName + dir[0]
-        bgSongs = dir[1]
+    # Finds all png files in the mod icons directory
+    for character in progress.each(inventory.findAll(f'{psychCharacterAssets}*.png')):
+        # Checks if the character is a file
+        if inventory.isFile(character):
+            logging.info(f'Copying asset {character}')
 
-        # Finds all the song folders
-        _allSongFiles = files.findAll(f'{psychSongs}*')
+            # Try except to avoid any errors
+            try:
+                filename = Path(character).name
+                # Some goofy ah mods don't name icons with icon-, causing them to be invalid in base game.
+                if not filename.startswith('icon-'):
+                    logging.warn(f"Invalid icon name being renamed from '{filename}' to 'icon-{filename}'!")
+                    filename = 'icon-' + filename
 
-        # Iterate through them
-        for song in _allSongFiles:
+                destination = f'{result_folder}/{modFoldername}{bgCharacterAssets}{filename}'
+                # Copies the icon over
+                fileCopy(character, destination)
 
-            # Get the song key
-            _songKeyUnformatted = Path(song).name
+                # Part 2, generating free play icons.
+                keyForThisIcon = filename.replace('icon-', '').replace('.png', '')
+                logging.info('Checking if ' + keyForThisIcon + ' is in the characterMap')
 
-            # Format it properly for Story Mode
-            songKeyFormatted = _songKeyUnformatted.replace(' ', '-').lower()
+                # Checks if the icon ID exists in the character map
+                if keyForThisIcon in characterMap:
 
-            logging.info(f'Checking if {song} is a valid song directory...')
+                    # Try except to avoid any errors
+                    try:
+                        # Woah, freeplay icons
+
+                        # Makes PIL shut up in our logs
+                        logging.getLogger('PIL').setLevel(logging.INFO)
+
+                        # Opens the icon with Image module
+                        with Image.open(character) as img:
+                            # Get the winning/normal half of icons
+                            normal_half = img.crop((0, 0, 150, 150))
+                            # Scale to 50x50, same size as BF and GF pixel icons
+                            pixel_img = normal_half.resize((50, 50), Image.Resampling.NEAREST)
+
+                            # Checks for every character assigned to this icon ID
+                            for characterName in characterMap[keyForThisIcon]:
+
+                                # Defines the name of the file
+                                pixel_name = characterName + 'pixel.png'
+                                freeplay_destination = f'{result_folder}/{modFoldername}{freeplayDir}/{pixel_name}'
+
+                                # Saves the icon
+                                pixel_img.save(freeplay_destination)
+                                logging.info(f'Saving converted freeplay icon to {freeplay_destination}')
+                    except Exception as ___exc:
+                        logging.error(f"Failed to create character {keyForThisIcon}'s freeplay icon: {___exc}")
+            except Exception as e:
+                logging.error(f'Could not copy asset {character}: {e}')
 
-            # Checks if the song folder is a directory
-            if Path(song).is_dir():
-                logging.info(f'Copying files in {song}')
+def copySongs(context, results):
+    """
+    Copies instrumentals and voices, running vocal split on the latter if chosen.
+    """
+    modName, modFoldername, result_folder = _paths(context)
+    inventory = context['inventory']
+    songOptions = context['options']['songs']
+    charts = results.get('charts') or []
 
-                # Get all files inside this song folder
-                _allAudioFiles = files.findAll(f'{song}/*')
+    # Opens the directory for songs folders
+    dir = Constants.FILE_LOCS.get('SONGS')
+    psychSongs = modName + dir[0]
+    bgSongs = dir[1]
 
-                # Iterate through all of them
-                for songFile in _allAudioFiles:
+    # Finds all the song folders
+    _allSongFiles = inventory.findAll(f'{psychSongs}*')
 
-                    # Get all the names of the files
-                    _AllAudiosClear = [Path(__song).name for __song in _allAudioFiles]
+    # Vocal Split jobs, ran together after the loop
+    splitJobs = []
+    splitOutputs = {}
+    splitCache = _cache(context, 'vocalSplit', False)
 
-                    # Check if this song folder is a Psych Engine 0.7.3 song folder
-                    isPsych073Song =  'Voices-Opponent.ogg' in _AllAudiosClear and 'Voices-Player.ogg' in _AllAudiosClear
+    # Iterate through them
+    for song in progress.each(_allSongFiles):
 
-                    # Check if the audio file is an instrumental and instrumental option is selected
-                    if Path(songFile).name == 'Inst.ogg' and songOptions['inst']:
-                        logging.info(f'Copying asset {songFile}')
+        # Get the song key
+        _songKeyUnformatted = Path(song).name
 
-                        # Try except to avoid any errors
-                        try:
+        # Format it properly for Story Mode
+        songKeyFormatted = _songKeyUnformatted.replace(' ', '-').lower()
 
-                            # Create the folder using the formatted song key
-                            folderMake(f'{result_folder}/{modFoldername}{bgSongs}{songKeyFormatted}')
+        logging.info(f'Checking if {song} is a valid song directory...')
 
-                            # Copy the file to that folder we just created
-                            fileCopy(songFile,
-                              f'{result_folder}/{modFoldername}{bgSongs}{songKeyFormatted}/{Path(songFile).name}')
-                        except Exception as e:
-                            logging.error(f'Could not copy asset {songFile}: {e}')
+        # Checks if the song folder is a directory
+        if inventory.isDir(song):
+            logging.info(f'Copying files in {song}')
 
-                    # Check if there is a Voices.ogg file and Vocal Split is enabled, and it isn't a Psych Engine 0.7.3 song
-                    elif Path(songFile).name == 'Voices.ogg' and songOptions['split'] and vocalSplitMasterToggle and not isPsych073Song:
-                        # Vocal Split runs here
-
-                        # Copy the song key
-                        songKey = _songKeyUnformatted
-
-                        # Define a new chart
-                        chart = None
-
-                        # Iterate through all charts
-                        for _chart in charts:
-                            # Check if this chart's key is the songKey
-                            if _chart['songKey'] == songKey:
-                                # Set the chart as this chart
-                                chart = charts[charts.index(_chart)]
-
-                        # Check if this chart isn't null
-                        if chart != None:
-                            # Uses the sections of the previously defined chart
-                            sections = chart['sections']
-                            # Gets the BPM
-                            bpm = chart['bpm']
-                            logging.info(f'Vocal Split ({songKey}) BPM is {bpm}')
-                            
-                            path = song + '/'
-                            resultPath = result_folder + f'/{modFoldername}{bgSongs}{songKeyFormatted}/'
-
-                            # Gets the characters of the metadata
-                            songChars = [chart['player'],
-                                          chart['opponent']]
-
-                            logging.info(f'Vocal Split currently running for: {songKey}')
-                            logging.info(f'Passed the following paths: {path} || {resultPath}')
-                            logging.info(f'Passed characters: {songChars}')
-
-                            # Run Vocal Split on a new thread
-                            vocal_split_thread = threading.Thread(target=VocalSplit.vocalsplit, args=(sections, bpm, path, resultPath, songKey, songChars))
-
-                            # Run the thread
-                            vocal_split_thread.start()
-
-                            # Wait for the thread to finish before continuing with any operations
-                            vocal_split_thread.join()
-                        else:
+            # Get all files inside this song folder
+            _allAudioFiles = inventory.findAll(f'{song}/*')
 
-                            # If no chart was found, just copy the file
-                            logging.warn(f'No chart was found for {songKey} so the vocal file will be copied instead.')
+            # Get all the names of the files
+            _AllAudiosClear = {Path(__song).name for __song in _allAudioFiles}
 
-                            # Try except to avoid any errors
-                            try:
-                                # Make the folder where the file will go
-                                folderMake(f'{result_folder}/{modFoldername}{bgSongs}{songKeyFormatted}')
-                                # Copy the file
-                                fileCopy(songFile,
-                                f'{result_folder}/{modFoldername}{bgSongs}{songKeyFormatted}/{Path(songFile).name}')
-                            except Exception as e:
-                                logging.error(f'Could not copy asset {songFile}: {e}')
+            # Check if this song folder is a Psych Engine 0.7.3 song folder
+            isPsych073Song =  'Voices-Opponent.ogg' in _AllAudiosClear and 'Voices-Player.ogg' in _AllAudiosClear
 
-                    # If the song is a Psych Engine 0.7.3 song
-                    elif isPsych073Song:
+            # Iterate through all of them
+            for songFile in _allAudioFiles:
 
-                        # Copy the song key unformatted
-                        songKey = _songKeyUnformatted
+                # Check if the audio file is an instrumental and instrumental option is selected
+                if Path(songFile).name == 'Inst.ogg' and songOptions['inst']:
+                    logging.info(f'Copying asset {songFile}')
 
-                        # Create the folder
+                    # Try except to avoid any errors
+                    try:
+
+                        # Create the folder using the formatted song key
                         folderMake(f'{result_folder}/{modFoldername}{bgSongs}{songKeyFormatted}')
 
-                        # Define a new chart
-                        chart = None
-
-                        # Iterate through the chart map to see if a chart has a song key
-                        for _chart in charts:
-                            # Look for the song key here
-                            if _chart['songKey'] == songKey:
-                                # Set the chart as this one
-                                chart = charts[charts.index(_chart)]
-
-                        # Check if the chart is valid
-                        if chart != None:
-                            # Try except to avoid any errors
-                            try:
-                                # Check if the file is Player audio
-                                if Path(songFile).name == 'Voices-Player.ogg':
-                                    # Copy it with Voices- + the player character
-                                    fileCopy(songFile, f"{result_folder}/{modFoldername}{bgSongs}{songKeyFormatted}/Voices-{chart.metadata['playData']['characters'].get('player')}.ogg")
-                                # Check if the file is Opponent audio
-                                elif Path(songFile).name == 'Voices-Opponent.ogg':
-                                    # Copy it with Voices- + the opponent character
-                                    fileCopy(songFile, f"{result_folder}/{modFoldername}{bgSongs}{songKeyFormatted}/Voices-{chart.metadata['playData']['characters'].get('opponent')}.ogg")
-
-                            except Exception as e:
-                                logging.error(f'Could not copy asset {songFile}: {e}')
-
-                        # If the chart isn't found, just copy it
+                        # Copy the file to that folder we just created
+                        fileCopy(songFile,
+                          f'{result_folder}/{modFoldername}{bgSongs}{songKeyFormatted}/{Path(songFile).name}')
+                    except Exception as e:
+                        logging.error(f'Could not copy asset {songFile}: {e}')
+
+                # Check if there is a Voices.ogg file and Vocal Split is enabled, and it isn't a Psych Engine 0.7.3 song
+                elif Path(songFile).name == 'Voices.ogg' and songOptions['split'] and vocalSplitMasterToggle and not isPsych073Song:
+                    # Vocal Split runs here
+
+                    # Copy the song key
+                    songKey = _songKeyUnformatted
+
+                    # Define a new chart
+                    chart = None
+
+                    # Iterate through all charts
+                    for _chart in charts:
+                        # Check if this chart's key is the songKey
+                        if _chart['songKey'] == songKey:
+                            # Set the chart as this chart
+                            chart = charts[charts.index(_chart)]
+
+                    # Check if this chart isn't null
+                    if chart != None:
+                        # Uses the sections of the previously defined chart
+                        sections = chart['sections']
+                        # Gets the BPM
+                        bpm = chart['bpm']
+                        logging.info(f'Vocal Split ({songKey}) BPM is {bpm}')
+
+                        path = song + '/'
+                        resultPath = result_folder + f'/{modFoldername}{bgSongs}{songKeyFormatted}/'
+
+                        # Gets the characters of the metadata
+                        songChars = [chart['player'],
+                                      chart['opponent']]
+
+                        logging.info(f'Vocal Split queued for: {songKey}')
+                        logging.info(f'Passed the following paths: {path} || {resultPath}')
+                        logging.info(f'Passed characters: {songChars}')
+
+                        # Make the folder where the split files will go
+                        folderMake(resultPath)
+
+                        splitJob = (sections, bpm, path, resultPath, songKey, songChars, songOptions.get('splitMode', 'ffmpeg'))
+                        fingerprint = splitCache.fingerprint([songFile], splitJob[:2] + splitJob[5:])
+
+                        if splitCache.get(songFile, fingerprint) != None:
+                            logging.info(f'Vocal Split for {songKey} did not change since the last conversion, skipping')
                         else:
-                            logging.warning(f'{songKeyFormatted} is a Psych Engine 0.7.3 song with separated vocals. Copy rename was attempted, however your chart was not found. These files will be copied instead.')
-                            # Psst! If you were taken here, your chart is needed to set your character to the file!
-                            fileCopy(songFile,
-                              f'{result_folder}/{modFoldername}{bgSongs}{songKeyFormatted}/{Path(songFile).name}')
-                    # Check if the user selected voices, as the final attempt to copy the file.
-                    elif songOptions['voices']:
-                        logging.info(f'Copying asset {songFile}')
+                            # Queue Vocal Split, every queued song is split once all files are copied
+                            splitJobs.append(splitJob)
+                            splitOutputs[songKey] = (songFile, fingerprint, [f'{resultPath}Voices-{character}.ogg' for character in songChars])
+                    else:
 
-                        # Warn Vocal Split is disabled and none other attempts could make it.
-                        if not vocalSplitMasterToggle:
-                            logging.warning('Vocal Split is disabled! This copy is the last.')
+                        # If no chart was found, just copy the file
+                        logging.warn(f'No chart was found for {songKey} so the vocal file will be copied instead.')
 
                         # Try except to avoid any errors
                         try:
-                            # Create the folder
+                            # Make the folder where the file will go
                             folderMake(f'{result_folder}/{modFoldername}{bgSongs}{songKeyFormatted}')
                             # Copy the file
                             fileCopy(songFile,
-                              f'{result_folder}/{modFoldername}{bgSongs}{songKeyFormatted}/{Path(songFile).name}')
+                            f'{result_folder}/{modFoldername}{bgSongs}{songKeyFormatted}/{Path(songFile).name}')
                         except Exception as e:
                             logging.error(f'Could not copy asset {songFile}: {e}')
-            # End block for 'songs' folder
 
-            # Check if the user selected sounds
-            if songOptions['sounds']: # Some people use directories on sounds, so I am adding support
+                # If the song is a Psych Engine 0.7.3 song
+                elif isPsych073Song:
+
+                    # Copy the song key unformatted
+                    songKey = _songKeyUnformatted
 
-                # Get the paths to the sounds folder
-                sounds_dir = Constants.FILE_LOCS.get('SOUNDS')
-                psychSounds = modName + sounds_dir[0]
-                baseSounds = sounds_dir[1]
+                    # Create the folder
+                    folderMake(f'{result_folder}/{modFoldername}{bgSongs}{songKeyFormatted}')
 
-                # Thankfully, glob ignores folders or files if they do not exist
-                allsoundsindirsounds = files.findAll(f'{psychSounds}*')
+                    # Define a new chart
+                    chart = None
 
-                # Iterate through all the files and directories
-                for asset in allsoundsindirsounds:
-                    logging.info(f'Checking on {asset}')
+                    # Iterate through the chart map to see if a chart has a song key
+                    for _chart in charts:
+                        # Look for the song key here
+                        if _chart['songKey'] == songKey:
+                            # Set the chart as this one
+                            chart = charts[charts.index(_chart)]
 
-                    # Check if it is a directory
-                    if Path(asset).is_dir():
-                        folderName = Path(asset).name
-                        logging.info(f'{asset} is a tree, attempting to copy it')
+                    # Check if the chart is valid
+                    if chart != None:
                         # Try except to avoid any errors
                         try:
-                            pathTo = f'{result_folder}/{modFoldername}{baseSounds}{folderName}'
-                            # Copy it
-                            treeCopy(asset, pathTo)
+                            # Check if the file is Player audio
+                            if Path(songFile).name == 'Voices-Player.ogg':
+                                # Copy it with Voices- + the player character
+                                fileCopy(songFile, f"{result_folder}/{modFoldername}{bgSongs}{songKeyFormatted}/Voices-{chart['player']}.ogg")
+                            # Check if the file is Opponent audio
+                            elif Path(songFile).name == 'Voices-Opponent.ogg':
+                                # Copy it with Voices- + the opponent character
+                                fileCopy(songFile, f"{result_folder}/{modFoldername}{bgSongs}{songKeyFormatted}/Voices-{chart['opponent']}.ogg")
+
                         except Exception as e:
-                            logging.error(f'Failed to copy {asset}: {e}')
+                            logging.error(f'Could not copy asset {songFile}: {e}')
 
-                    # If it isn't a directory
+                    # If the chart isn't found, just copy it
                     else:
-                        logging.info(f'{asset} is file, copying')
+                        logging.warning(f'{songKeyFormatted} is a Psych Engine 0.7.3 song with separated vocals. Copy rename was attempted, however your chart was not found. These files will be copied instead.')
+                        # Psst! If you were taken here, your chart is needed to set your character to the file!
+                        fileCopy(songFile,
+                          f'{result_folder}/{modFoldername}{bgSongs}{songKeyFormatted}/{Path(songFile).name}')
+                # Check if the user selected voices, as the final attempt to copy the file.
+                elif songOptions['voices']:
+                    logging.info(f'Copying asset {songFile}')
+
+                    # Warn Vocal Split is disabled and none other attempts could make it.
+                    if not vocalSplitMasterToggle:
+                        logging.warning('Vocal Split is disabled! This copy is the last.')
 
-                        # Try except to avoid any errors
-                        try:
-                            # Make the folder where it should go
-                            folderMake(f'{result_folder}/{modFoldername}{baseSounds}')
-                            # Copy it
-                            fileCopy(asset, f'{result_folder}/{modFoldername}{baseSounds}{Path(asset).name}')
-                        except Exception as e:
-                            logging.error(f'Failed to copy {asset}: {e}')
-
-            # Get if the user selected sounds
-            if songOptions['music']:
-                # Get the paths to the music directory
-                sounds_dir = Constants.FILE_LOCS.get('MUSIC')
-                psychSounds = modName + sounds_dir[0]
-                baseSounds = sounds_dir[1]
-
-                # Get all the files (misleading variable name)
-                allsoundsindirsounds = files.findAll(f'{psychSounds}*')
-            
-                # Iterate through all the files
-                for asset in allsoundsindirsounds:
-                    logging.info(f'Copying asset {asset}')
                     # Try except to avoid any errors
                     try:
-                        # Make the folder
-                        folderMake(f'{result_folder}/{modFoldername}{baseSounds}')
+                        # Create the folder
+                        folderMake(f'{result_folder}/{modFoldername}{bgSongs}{songKeyFormatted}')
                         # Copy the file
-                        fileCopy(asset,
-                            f'{result_folder}/{modFoldername}{baseSounds}{Path(asset).name}')
+                        fileCopy(songFile,
+                          f'{result_folder}/{modFoldername}{bgSongs}{songKeyFormatted}/{Path(songFile).name}')
                     except Exception as e:
-                        logging.error(f'Could not copy asset {asset}: {e}')
-
-    # Define the week conversion options
-    weekCOptions = options.get('weeks', {
-            'props': False, # Asset
-            'levels': False,
-            'titles': False # Asset
-        })  
-    # See if levels was selected from the week options
-    if weekCOptions['levels']:
-        logging.info('Converting weeks (levels)...')
-
-        # Get the paths to the week files
-        dir = Constants.FILE_LOCS.get('WEEKS')
-        psychWeeks = modName + dir[0]
-        baseLevels = dir[1]
-
-        # Create the folder where the weeks should go
-        folderMake(f'{result_folder}/{modFoldername}{baseLevels}')
-
-        # Find all the jsons in the psych engine mod's weeks
-        for week in files.findAll(f'{psychWeeks}*.json'):
-            try:
-                logging.info(f'Loading {week} into the converter...')
+                        logging.error(f'Could not copy asset {songFile}: {e}')
 
-                # Open the json as a file
-                weekJSON = json.loads(open(week, 'r').read())
+    if len(splitJobs) > 0:
+        failed = VocalSplit.splitQueue(splitJobs)
 
-                # Get the week key
-                week_filename = Path(week).name
+        for songKey, (songFile, fingerprint, outputs) in splitOutputs.items():
+            if songKey not in failed:
+                splitCache.put(songFile, fingerprint, outputs)
 
-                # Convert the week
-                converted_week = WeekTools.convert(weekJSON, modName, week_filename)
-                
-                # Write it to a new JSON file
-                open(f'{result_folder}/{modFoldername}{baseLevels}{week_filename}', 'w').write(json.dumps(converted_week, indent=4))
+        splitCache.save()
+
+def copySounds(context, results):
+    """
+    Copies the sounds folder.
+    """
+    modName, modFoldername, result_folder = _paths(context)
+    inventory = context['inventory']
+    # Some people use directories on sounds, so I am adding support
+    # Get the paths to the sounds folder
+    sounds_dir = Constants.FILE_LOCS.get('SOUNDS')
+    psychSounds = modName + sounds_dir[0]
+    baseSounds = sounds_dir[1]
+
+    # Thankfully, glob ignores folders or files if they do not exist
+    allsoundsindirsounds = inventory.findAll(f'{psychSounds}*')
+
+    # Iterate through all the files and directories
+    for asset in progress.each(allsoundsindirsounds):
+        logging.info(f'Checking on {asset}')
+
+        # Check if it is a directory
+        if inventory.isDir(asset):
+            folderName = Path(asset).name
+            logging.info(f'{asset} is a tree, attempting to copy it')
+            # Try except to avoid any errors
+            try:
+                pathTo = f'{result_folder}/{modFoldername}{baseSounds}{folderName}'
+                # Copy it
+                treeCopy(asset, pathTo, inventory)
             except Exception as e:
-                logging.error(f'Error converting week {week}: {e}')
+                logging.error(f'Failed to copy {asset}: {e}')
 
-    # See if props was selected from the week options
-    if weekCOptions['props']:
-        logging.info('Copying prop assets...')
+        # If it isn't a directory
+        else:
+            logging.info(f'{asset} is file, copying')
 
-        # Get the paths to the character asset files
-        dir = Constants.FILE_LOCS.get('WEEKCHARACTERASSET')
-        psychWeeks = modName + dir[0]
-        baseLevels = dir[1]
+            # Try except to avoid any errors
+            try:
+                # Make the folder where it should go
+                folderMake(f'{result_folder}/{modFoldername}{baseSounds}')
+                # Copy it
+                fileCopy(asset, f'{result_folder}/{modFoldername}{baseSounds}{Path(asset).name}')
+            except Exception as e:
+                logging.error(f'Failed to copy {asset}: {e}')
 
-        # Get all xml files in the assets folder
-        allXml = files.findAll(f'{psychWeeks}*.xml')
+def copyMusic(context, results):
+    """
+    Copies the music folder.
+    """
+    modName, modFoldername, result_folder = _paths(context)
+    inventory = context['inventory']
 
-        # Get all png files in the assets folder
-        allPng = files.findAll(f'{psychWeeks}*.png')
+    # Get the paths to the music directory
+    sounds_dir = Constants.FILE_LOCS.get('MUSIC')
+    psychSounds = modName + sounds_dir[0]
+    baseSounds = sounds_dir[1]
 
-        # Combine and iterate
-        for asset in allXml + allPng:
-            logging.info(f'Copying {asset}')
+    # Get all the files (misleading variable name)
+    allsoundsindirsounds = inventory.findAll(f'{psychSounds}*')
 
-            # Try except to avoid any errors
-            try:
-                # Create the folder where they should go
-                folderMake(f'{result_folder}/{modFoldername}{baseLevels}')
-                # Copy the file
-                fileCopy(asset,
-                    f'{result_folder}/{modFoldername}{baseLevels}{Path(asset).name}')
-            except Exception as e:
-                logging.error(f'Could not copy asset {asset}: {e}')
+    # Iterate through all the files
+    for asset in progress.each(allsoundsindirsounds):
+        logging.info(f'Copying asset {asset}')
+        # Try except to avoid any errors
+        try:
+            # Make the folder
+            folderMake(f'{result_folder}/{modFoldername}{baseSounds}')
+            # Copy the file
+            fileCopy(asset,
+                f'{result_folder}/{modFoldername}{baseSounds}{Path(asset).name}')
+        except Exception as e:
+            logging.error(f'Could not copy asset {asset}: {e}')
+
+def convertLevels(context, results):
+    """
+    Converts weeks to levels.
+    """
+    modName, modFoldername, result_folder = _paths(context)
+    inventory = context['inventory']
+
+    logging.info('Converting weeks (levels)...')
+
+    # Get the paths to the week files
+    dir = Constants.FILE_LOCS.get('WEEKS')
+    psychWeeks = modName + dir[0]
+    baseLevels = dir[1]
+
+    # Create the folder where the weeks should go
+    folderMake(f'{result_folder}/{modFoldername}{baseLevels}')
+
+    cache = _cache(context, 'levels')
+
+    # Find all the jsons in the psych engine mod's weeks
+    for week in progress.each(inventory.findAll(f'{psychWeeks}*.json')):
+        try:
+            logging.info(f'Loading {week} into the converter...')
+
+            # Open the json as a file
+            weekJSON = jsonio.load(week)
+
+            # Get the week key
+            week_filename = Path(week).name
+            levelPath = f'{result_folder}/{modFoldername}{baseLevels}{week_filename}'
+
+            # The menu characters of the week are read by the converter too
+            menuCharacters = [f"{modName}{Constants.FILE_LOCS.get('WEEKCHARACTERJSON')[0]}{char}.json" for char in weekJSON.get('weekCharacters', [])]
+            fingerprint = cache.fingerprint([week] + menuCharacters)
+
+            if cache.get(week, fingerprint) != None:
+                logging.info(f'{week} did not change since the last conversion, skipping')
+                continue
+
+            # Convert the week
+            converted_week = WeekTools.convert(weekJSON, modName, week_filename)
+
+            # Write it to a new JSON file
+            jsonio.dump(converted_week, levelPath, indent=4)
+            cache.put(week, fingerprint, [levelPath])
+        except Exception as e:
+            logging.error(f'Error converting week {week}: {e}')
+
+    cache.save()
+
+def copyProps(context, results):
+    """
+    Copies menu character assets.
+    """
+    modName, modFoldername, result_folder = _paths(context)
+    inventory = context['inventory']
+
+    logging.info('Copying prop assets...')
+
+    # Get the paths to the character asset files
+    dir = Constants.FILE_LOCS.get('WEEKCHARACTERASSET')
+    psychWeeks = modName + dir[0]
+    baseLevels = dir[1]
+
+    # Get all xml files in the assets folder
+    allXml = inventory.findAll(f'{psychWeeks}*.xml')
+
+    # Get all png files in the assets folder
+    allPng = inventory.findAll(f'{psychWeeks}*.png')
+
+    # Combine and iterate
+    for asset in progress.each(allXml + allPng):
+        logging.info(f'Copying {asset}')
+
+        # Try except to avoid any errors
+        try:
+            # Create the folder where they should go
+            folderMake(f'{result_folder}/{modFoldername}{baseLevels}')
+            # Copy the file
+            fileCopy(asset,
+                f'{result_folder}/{modFoldername}{baseLevels}{Path(asset).name}')
+        except Exception as e:
+            logging.error(f'Could not copy asset {asset}: {e}')
+
+def copyTitles(context, results):
+    """
+    Copies week title images.
+    """
+    modName, modFoldername, result_folder = _paths(context)
+    inventory = context['inventory']
 
-    # See if titles was selected from the week options
-    if weekCOptions['titles']:
-        logging.info('Copying level titles...')
+    logging.info('Copying level titles...')
 
-        # Get the paths to the week images
-        dir = Constants.FILE_LOCS.get('WEEKIMAGE')
-        psychWeeks = f'{modName}{dir[0]}'
-        baseLevels = dir[1]
+    # Get the paths to the week images
+    dir = Constants.FILE_LOCS.get('WEEKIMAGE')
+    psychWeeks = f'{modName}{dir[0]}'
+    baseLevels = dir[1]
 
-        # Find all pngs there
-        allPng = files.findAll(f'{psychWeeks}*.png')
+    # Find all pngs there
+    allPng = inventory.findAll(f'{psychWeeks}*.png')
 
-        # Get all the pngs
-        for asset in allPng:
-            logging.info(f'Copying week title asset: {asset}')
+    # Get all the pngs
+    for asset in progress.each(allPng):
+        logging.info(f'Copying week title asset: {asset}')
+
+        # Try except to avoid any errors
+        try:
+            # Make the folder
+            folderMake(f'{result_folder}/{modFoldername}{baseLevels}')
+            # Copy the file
+            fileCopy(asset,
+                f'{result_folder}/{modFoldername}{baseLevels}{Path(asset).name}')
+        except Exception as e:
+            logging.error(f'Could not copy asset {asset}: {e}')
+    #else: 
+    #    logging.info(f'A week for {modName} has no story menu image, replacing with a default.')
+    #    with open(f'week{modName}.png', 'wb') as fh:
+    #        #id be surprised if this works
+    #        try:
+    #            folderMake(f'{result_folder}/{modFoldername}{baseLevels}')
+    #            Image.open(base64.b64decode(data[Constants.BASE64_IMAGES.get('missingWeek')]))
+    #            Image.save(f'{result_folder}/{modFoldername}{baseLevels}')
+    #        except Exception as e:
+    #            logging.error(f"Couldn't generate week image to {modFoldername}/{baseLevels}: {e}")
+
+def convertStages(context, results):
+    """
+    Converts stage jsons and the props in their lua scripts.
+    """
+    modName, modFoldername, result_folder = _paths(context)
+    inventory = context['inventory']
+
+    logging.info('Converting stages...')
+
+    # Get the paths to stages
+    dir = Constants.FILE_LOCS.get('STAGE')
+    psychStages = modName + dir[0]
+    baseStages = dir[1]
+
+    cache = _cache(context, 'stages')
+
+    # Get all stage JSONS
+    allStageJSON = inventory.findAll(f'{psychStages}*.json')
+    # Iterate through all stage JSONS
+    for asset in progress.each(allStageJSON):
+        logging.info(f'Converting {asset}')
+
+        # Make the folder for the stages
+        folderMake(f'{result_folder}/{modFoldername}{baseStages}')
+
+        # Get the path to it
+        assetPath = f'{result_folder}/{modFoldername}{baseStages}{Path(asset).name}'
+
+        # Get the lua path
+        stageLua = asset.replace('.json', '.lua')
+
+        fingerprint = cache.fingerprint([asset, stageLua])
+        if cache.get(asset, fingerprint) != None:
+            logging.info(f'{asset} did not change since the last conversion, skipping')
+            continue
+
+        # Open the stage JSON as a json object
+        stageJSON = jsonio.load(asset)
+
+        logging.info(f'Parsing .lua with matching .json name: {stageLua}')
+
+        # Build array of lua props
+        luaProps = []
+
+        # Check if the lua file exists
+        if inventory.exists(stageLua):
+            logging.info(f'Parsing {stageLua} and attempting to extract methods and calls')
 
             # Try except to avoid any errors
             try:
-                # Make the folder
-                folderMake(f'{result_folder}/{modFoldername}{baseLevels}')
-                # Copy the file
-                fileCopy(asset,
-                    f'{result_folder}/{modFoldername}{baseLevels}{Path(asset).name}')
+                # Assign props by reading and parsing the lua file
+                luaProps = StageLuaParse.parseStage(stageLua)
             except Exception as e:
-                logging.error(f'Could not copy asset {asset}: {e}')
-        #else: 
-        #    logging.info(f'A week for {modName} has no story menu image, replacing with a default.')
-        #    with open(f'week{modName}.png', 'wb') as fh:
-        #        #id be surprised if this works
-        #        try:
-        #            folderMake(f'{result_folder}/{modFoldername}{baseLevels}')
-        #            Image.open(base64.b64decode(data[Constants.BASE64_IMAGES.get('missingWeek')]))
-        #            Image.save(f'{result_folder}/{modFoldername}{baseLevels}')
-        #        except Exception as e:
-        #            logging.error(f"Couldn't generate week image to {modFoldername}/{baseLevels}: {e}")
-
-    # See if stages was selected
-    if options.get('stages', False):
-        logging.info('Converting stages...')
-
-        # Get the paths to stages
-        dir = Constants.FILE_LOCS.get('STAGE')
-        psychStages = modName + dir[0]
-        baseStages = dir[1]
-
-        # Get all stage JSONS
-        allStageJSON = files.findAll(f'{psychStages}*.json')
-        # Iterate through all stage JSONS
-        for asset in allStageJSON:
-            logging.info(f'Converting {asset}')
-
-            # Make the folder for the stages
-            folderMake(f'{result_folder}/{modFoldername}{baseStages}')
-
-            # Open the stage JSON as a json object
-            stageJSON = json.loads(open(asset, 'r').read())
-
-            # Get the path to it
-            assetPath = f'{result_folder}/{modFoldername}{baseStages}{Path(asset).name}'
-        
-            # Get the lua path
-            stageLua = asset.replace('.json', '.lua')
-            logging.info(f'Parsing .lua with matching .json name: {stageLua}')
-
-            # Build array of lua props
-            luaProps = []
-
-            # Check if the lua file exists
-            if Path(stageLua).exists():
-                logging.info(f'Parsing {stageLua} and attempting to extract methods and calls')
-
-                # Try except to avoid any errors
-                try:
-                    # Assign props by reading and parsing the lua file
-                    luaProps = StageLuaParse.parseStage(stageLua)
-                except Exception as e:
-                    logging.error(f'Could not complete parsing of {stageLua}: {e}')
-                    continue
+                logging.error(f'Could not complete parsing of {stageLua}: {e}')
+                continue
 
-            logging.info(f'Converting Stage JSON')
+        logging.info(f'Converting Stage JSON')
 
-            # Save the stage JSON as a JSON.
-            stageJSONConverted = json.dumps(StageTool.convert(stageJSON, Path(asset).name, luaProps), indent=4)
-            open(assetPath, 'w').write(stageJSONConverted)
+        # Save the stage JSON as a JSON.
+        jsonio.dump(StageTool.convert(stageJSON, Path(asset).name, luaProps), assetPath, indent=4)
+        cache.put(asset, fingerprint, [assetPath])
 
-    # Check if the user selected images
-    if options.get('images'): # Images include XMLs
-        logging.info('Copying images')
+    cache.save()
 
-        # Get the path to the images folder
-        dir = Constants.FILE_LOCS.get('IMAGES')
-        psychImages = modName + dir[0]
-        baseImages = dir[1]
+def copyImages(context, results):
+    """
+    Copies the images folder, minus folders handled by other stages.
+    """
+    modName, modFoldername, result_folder = _paths(context)
+    inventory = context['inventory']
 
-        # Find all files in the images folder
-        allimagesandfolders = files.findAll(f'{psychImages}*')
-        for asset in allimagesandfolders:
-            logging.info(f'Checking on {asset}')
+    logging.info('Copying images')
 
-            # For directories, to make sure we don't copy directories by Psych Engine 
-            if Path(asset).is_dir():
-                logging.info(f'{asset} is directory, checking if it should be excluded...')
+    # Get the path to the images folder
+    dir = Constants.FILE_LOCS.get('IMAGES')
+    psychImages = modName + dir[0]
+    baseImages = dir[1]
 
-                # Get the folder's name
-                folderName = Path(asset).name
+    # Find all files in the images folder
+    allimagesandfolders = inventory.findAll(f'{psychImages}*')
+    for asset in progress.each(allimagesandfolders):
+        logging.info(f'Checking on {asset}')
 
-                # Check if this folder is not in the exclude list
-                if not folderName in Constants.EXCLUDE_FOLDERS_IMAGES['PsychEngine']:
-                    logging.info(f'{asset} is not excluded... attempting to copy.')
-                    # Try except to avoid any errors
-                    try:
-                        pathTo = f'{result_folder}/{modFoldername}{baseImages}{folderName}'
-                        # Copy it
-                        treeCopy(asset, pathTo)
-                    except Exception as e:
-                        logging.error(f'Failed to copy {asset}: {e}')
-                else:
-                    # It is excluded
-                    logging.warn(f'{asset} is excluded. Skipped')
+        # For directories, to make sure we don't copy directories by Psych Engine 
+        if inventory.isDir(asset):
+            logging.info(f'{asset} is directory, checking if it should be excluded...')
 
-            else:
-                # It is a file
-                logging.info(f'{asset} is file, copying')
+            # Get the folder's name
+            folderName = Path(asset).name
 
+            # Check if this folder is not in the exclude list
+            if not folderName in Constants.EXCLUDE_FOLDERS_IMAGES['PsychEngine']:
+                logging.info(f'{asset} is not excluded... attempting to copy.')
                 # Try except to avoid any errors
                 try:
-                    # Make the folder
-                    folderMake(f'{result_folder}/{modFoldername}{baseImages}')
-                    # Copy the file
-                    fileCopy(asset, f'{result_folder}/{modFoldername}{baseImages}{Path(asset).name}')
+                    pathTo = f'{result_folder}/{modFoldername}{baseImages}{folderName}'
+                    # Copy it
+                    treeCopy(asset, pathTo, inventory)
                 except Exception as e:
                     logging.error(f'Failed to copy {asset}: {e}')
+            else:
+                # It is excluded
+                logging.warn(f'{asset} is excluded. Skipped')
+
+        else:
+            # It is a file
+            logging.info(f'{asset} is file, copying')
+
+            # Try except to avoid any errors
+            try:
+                # Make the folder
+                folderMake(f'{result_folder}/{modFoldername}{baseImages}')
+                # Copy the file
+                fileCopy(asset, f'{result_folder}/{modFoldername}{baseImages}{Path(asset).name}')
+            except Exception as e:
+                logging.error(f'Failed to copy {asset}: {e}')
+
+def convert(psych_mod_folder, result_folder, options, tracker:progress.Progress = None):
+    """
+    Converts a mod.
+    
+    Args:
+        psych_mod_folder (str): Path to the Psych Engine mod folder.
+        result_folder (str): Path to the Base Game 'mods' folder.
+        options (dict): Set of options chosen by the user.
+        tracker (progress.Progress): Reports how far the conversion is, and cancels it between files.
+
+    Returns:
+        bool: False if the conversion was cancelled.
+    """
+
+    progress.track(tracker)
+    tracing.start(options.get('profile'))
+    StageLuaParse.clearCache()
+
+    # Logs the time at which the conversion began.
+    runtime = time.time()
+
+    # Announces a large string of text indicating the conversion has began.
+    logging.info(Utils.coolText("NEW CONVERSION STARTED"))
+    logging.info(options)
+
+    logging.info(f'Converting from{psych_mod_folder} to {result_folder}')
+
+    with tracing.span('inventory', mod=psych_mod_folder):
+        inventory = files.ModInventory(psych_mod_folder)
+
+    context = {
+        # Variable used to refer to the mod folder path.
+        'modName': psych_mod_folder,
+        # Variable used to refer to the name of the mod folder.
+        'modFoldername': Path(psych_mod_folder).name,
+        'resultFolder': result_folder,
+        'options': options,
+        # Every file of the mod, stages find their inputs here instead of searching the disk
+        'inventory': inventory
+    }
+
+    chartOptions = options.get('charts', {})
+    songOptions = options.get('songs', {})
+    characterOptions = options.get('characters', {})
+    weekCOptions = options.get('weeks', {})
+
+    # Each stage only waits for the stages it takes results from, the rest can run at the same time.
+    stages = [
+        scheduler.Stage('modpack_meta', convertPackMeta, enabled=options.get('modpack_meta', False)),
+        scheduler.Stage('charts', convertCharts, enabled=chartOptions.get('songs', False)),
+        scheduler.Stage('eventScripts', writeEventScripts, enabled=chartOptions.get('events', False)),
+        scheduler.Stage('characterAssets', copyCharacterAssets, enabled=characterOptions.get('assets', False)),
+        scheduler.Stage('characterJsons', convertCharacterJsons, enabled=characterOptions.get('json', False)),
+        scheduler.Stage('icons', copyCharacterIcons, ['characterJsons'], enabled=characterOptions.get('icons', False)),
+        scheduler.Stage('songs', copySongs, ['charts'], enabled=any(songOptions.get(key, False) for key in ['inst', 'voices', 'split'])),
+        scheduler.Stage('sounds', copySounds, enabled=songOptions.get('sounds', False)),
+        scheduler.Stage('music', copyMusic, enabled=songOptions.get('music', False)),
+        scheduler.Stage('levels', convertLevels, enabled=weekCOptions.get('levels', False)),
+        scheduler.Stage('props', copyProps, enabled=weekCOptions.get('props', False)),
+        scheduler.Stage('titles', copyTitles, enabled=weekCOptions.get('titles', False)),
+        scheduler.Stage('stages', convertStages, enabled=options.get('stages', False)),
+        scheduler.Stage('images', copyImages, enabled=options.get('images', False))
+    ]
+
+    workerOptions = options.get('workers', {})
+    try:
+        with tracing.span('conversion'):
+            scheduler.run([stage for stage in stages if stage.enabled], context,
+                workerOptions.get('count', 1), workerOptions.get('kind', 'thread'), setup=setupStage)
+    except progress.Cancelled:
+        logging.warn(f'Conversion cancelled after {time.time() - runtime}s, the files converted so far were kept')
+        tracing.save()
+        log.flush()
+        return False
 
     # Complete the conversion by announcing it has completed
     logging.info(Utils.coolText("CONVERSION COMPLETED"))
 
     # Announce how long it took to convert it
     logging.info(f'Conversion done: Took {time.time() - runtime}s')
+    tracing.save()
+    log.flush()
 
+    return True
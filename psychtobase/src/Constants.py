@@ -5,12 +5,16 @@ A module full of templates needed for mod conversion.
 DEFAULT_OPTIONS = {
   'charts': {
     'songs': False,  # Chart supremacy!
-    'events': False
+    'events': False,
+    'jobs': 1, # Processes converting songs at once
+    'stream': False, # Load one difficulty at a time, for charts too big to all fit in memory
+    'vectorize': True # Convert notes with NumPy, falling back to the slower loop for charts it can't handle
   },
   'songs': { # Technically "audios", but whatever
     'inst': False,
     'voices': False,
     'split': False,
+    'splitMode': 'ffmpeg', # 'ffmpeg' splits in one ffmpeg run, 'numpy' decodes the vocals into Python
     'music': False,
     'sounds': False
   },
@@ -26,7 +30,20 @@ DEFAULT_OPTIONS = {
   },
   'stages': False,
   'modpack_meta': False,
-  'images': False
+  'images': False,
+  'cache': True, # Skip inputs that didn't change since the last conversion
+  'compact': False, # Write JSON without indentation, smaller and faster to write
+  'trace': False, # Log every step of the stage .lua parser, slow on big scripts
+  'profile': None, # Path of a Chrome trace (Perfetto) file timing every stage, song and file of the conversion
+  'copy': {
+    'mode': 'copy', # 'copy', 'hardlink' (no extra disk space, same drive only) or 'reflink' (copy-on-write clone)
+    'skip': 'stat', # Don't copy files already in the output: 'stat' (same size and date), 'hash' (same contents) or None
+    'workers': 8 # Threads copying the files of a folder
+  },
+  'workers': {
+    'count': 1, # How many stages can run at once, 1 runs them one after another
+    'kind': 'thread' # 'thread' or 'process'
+  }
 }
 
 DIFFICULTIES:list = ["easy", "normal", "hard"]
@@ -1,4 +1,4 @@
-import json
+from . import jsonio
 from pathlib import Path
 
 class Paths:
@@ -27,16 +27,14 @@ class Paths:
 	@staticmethod
 	def parseJson(file: str):
 		try:
-			with open(Paths.json(file), 'r') as f:
-				return json.load(f)
+			return jsonio.load(Paths.json(file))
 		except Exception as e:
 			print(f"Error! {e}")
 
 	@staticmethod
-	def writeJson(file:str, writeFile:dict, indent:int = 4):
+	def writeJson(file:str, writeFile:dict, indent:int = 4, compact:bool = None):
 		try:
-			with open(Paths.json(file), 'w') as f:
-				return json.dump(writeFile, f, indent = indent)
+			return jsonio.dump(writeFile, Paths.json(file), indent, compact)
 		except Exception as e:
 			print(f"Error! {e}")
 
@@ -5,6 +5,7 @@ A class full of tools needed for mod conversion.
 import time
 
 from . import Constants
+from array import array
 from re import sub
 
 def getRuntime(start:float) -> float:
@@ -56,6 +57,86 @@ def note(data:int, length:float, time:str) -> dict:
 		return {"d": data, "t": time} # This is how the base game charts handle it so...
 	return {"d": data, "l": length, "t": time}
 
+class NoteList:
+	"""
+	The notes of a difficulty, stored as parallel arrays instead of a dict per note.
+	Serializes to the same list note() would have built (see jsonio), ints staying ints and floats staying floats.
+
+	Notes the arrays can't hold exactly (lanes outside a short, odd types) turn the whole list into plain dicts.
+	"""
+	# Flags of a note
+	TIME_INT = 1
+	LENGTH_INT = 2
+	HAS_LENGTH = 4
+
+	def __init__(self):
+		self.data = array('h')
+		self.times = array('d')
+		self.lengths = array('d')
+		self.flags = array('B')
+
+		# Plain note() dicts, once a note didn't fit in the arrays
+		self.dicts = None
+
+	def append(self, data:int, length:float, noteTime:float):
+		"""
+		Adds a note, taking the same arguments as note().
+		"""
+		if self.dicts == None and not self._fits(data, length, noteTime):
+			self.dicts = list(self)
+
+		if self.dicts != None:
+			self.dicts.append(note(data, length, noteTime))
+			return
+
+		flags = self.TIME_INT if type(noteTime) == int else 0
+		if not (length == 0 or isinstance(length, str)):
+			flags |= self.HAS_LENGTH | (self.LENGTH_INT if type(length) == int else 0)
+		else:
+			length = 0
+
+		self.data.append(data)
+		self.times.append(noteTime)
+		self.lengths.append(length)
+		self.flags.append(flags)
+
+	@staticmethod
+	def _fits(data, length, noteTime) -> bool:
+		def exact(value):
+			return type(value) == float or (type(value) == int and abs(value) < 2 ** 53)
+
+		return type(data) == int and -32768 <= data < 32768 and exact(noteTime) and (exact(length) or isinstance(length, str))
+
+	def extendColumns(self, data:array, times:array, lengths:array, flags:array):
+		"""
+		Adds notes straight from arrays with the same types as the columns, lengths being 0 where there's none.
+		"""
+		if self.dicts != None:
+			raise ValueError('Columns can only be added while notes are stored in arrays')
+
+		self.data.extend(data)
+		self.times.extend(times)
+		self.lengths.extend(lengths)
+		self.flags.extend(flags)
+
+	def __len__(self) -> int:
+		return len(self.dicts) if self.dicts != None else len(self.data)
+
+	def __iter__(self):
+		if self.dicts != None:
+			yield from self.dicts
+			return
+
+		for data, noteTime, length, flags in zip(self.data, self.times, self.lengths, self.flags):
+			noteTime = int(noteTime) if flags & self.TIME_INT else noteTime
+			if flags & self.HAS_LENGTH:
+				yield {"d": data, "l": int(length) if flags & self.LENGTH_INT else length, "t": noteTime}
+			else:
+				yield {"d": data, "t": noteTime}
+
+	def toJson(self) -> list:
+		return list(self)
+
 def event(time:float, event:str, values:dict) -> dict:
 	"""
 	Function created for faster creation of events.
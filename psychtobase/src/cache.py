@@ -0,0 +1,140 @@
+"""
+Remembers what every input of a conversion was turned into, so re-porting a mod skips whatever didn't change.
+
+Entries are keyed by input and store a hash of the input files, the porter version and the options
+that change the output. Every stage keeps its own manifest, so stages running on other processes never share one.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+
+from . import Constants
+from pathlib import Path
+
+CACHE_FOLDER = '.fnf-porter-cache'
+
+# Bump when a converter changes its output without the porter version changing
+CACHE_VERSION = 1
+
+class ConversionCache:
+	"""
+	Manifest of one stage.
+
+	Args:
+		result_folder (str): Path to the Base Game 'mods' folder.
+		modFoldername (str): Name of the mod being converted.
+		stage (str): Name of the stage using this cache.
+		enabled (bool): When False nothing is read or written and every input is converted.
+		inventory (files.ModInventory): Inventory of the mod, input files are stat'ed from it.
+		settings (list): JSON serializable options changing every output of the stage, added to each fingerprint.
+	"""
+	def __init__(self, result_folder:str, modFoldername:str, stage:str, enabled:bool = True, inventory = None, settings:list = None):
+		self.path = Path(result_folder) / CACHE_FOLDER / modFoldername / f'{stage}.json'
+		self.enabled = enabled
+		self.inventory = inventory
+		self.settings = settings or []
+		self.lock = threading.Lock()
+
+		self.entries = {}
+		# Hashes of input files by path, with the size and mtime they had, to skip rehashing untouched files
+		self.files = {}
+
+		if enabled and self.path.exists():
+			try:
+				with open(self.path, 'r') as f:
+					manifest = json.load(f)
+
+				if manifest.get('version') == [Constants.VERSION, CACHE_VERSION]:
+					self.entries = manifest.get('entries', {})
+					self.files = manifest.get('files', {})
+			except Exception as e:
+				logging.warn(f'Could not read conversion cache {self.path}, converting everything: {e}')
+
+	def hashFile(self, file) -> str:
+		path = str(Path(file).resolve())
+		entry = self.inventory.get(file) if self.inventory != None else None
+		if entry != None:
+			size, mtime = entry.size, entry.mtime
+		else:
+			stat = Path(path).stat()
+			size, mtime = stat.st_size, stat.st_mtime_ns
+
+		with self.lock:
+			known = self.files.get(path)
+		if known != None and known[0] == size and known[1] == mtime:
+			return known[2]
+
+		digest = hashlib.sha256()
+		with open(path, 'rb') as f:
+			for block in iter(lambda: f.read(1 << 20), b''):
+				digest.update(block)
+
+		with self.lock:
+			self.files[path] = [size, mtime, digest.hexdigest()]
+		return digest.hexdigest()
+
+	def fingerprint(self, inputs:list, *options) -> str:
+		"""
+		Hash of the input files and anything else that changes the output.
+
+		Args:
+			inputs (list): Paths of the input files. Missing files are part of the hash too.
+			options: JSON serializable values, like the options used by the converter.
+		"""
+		digest = hashlib.sha256(json.dumps([Constants.VERSION, CACHE_VERSION, self.settings, options], sort_keys=True, default=str).encode())
+
+		for file in sorted(str(file) for file in inputs):
+			digest.update(file.encode())
+			isFile = self.inventory.isFile(file) if self.inventory != None else Path(file).is_file()
+			digest.update((self.hashFile(file) if isFile else 'missing').encode())
+
+		return digest.hexdigest()
+
+	def get(self, key:str, fingerprint:str) -> dict:
+		"""
+		The entry of an input if its fingerprint still matches and all of its outputs exist, None otherwise.
+		What the converter returned for it is in entry['result'].
+		"""
+		if not self.enabled:
+			return None
+
+		with self.lock:
+			entry = self.entries.get(key)
+
+		if entry == None or entry['fingerprint'] != fingerprint:
+			return None
+		if not all(Path(output).exists() for output in entry['outputs']):
+			return None
+
+		return entry
+
+	def put(self, key:str, fingerprint:str, outputs:list, result = None):
+		"""
+		Records what an input was converted to.
+
+		Args:
+			key (str): The input, usually its path.
+			fingerprint (str): From fingerprint(), computed before converting.
+			outputs (list): Paths of the files written for it.
+			result: JSON serializable value the converter returned, handed back by get().
+		"""
+		if not self.enabled:
+			return
+
+		with self.lock:
+			self.entries[key] = {'fingerprint': fingerprint, 'outputs': [str(output) for output in outputs], 'result': result}
+
+	def save(self):
+		if not self.enabled:
+			return
+
+		try:
+			self.path.parent.mkdir(parents=True, exist_ok=True)
+			with self.lock:
+				manifest = {'version': [Constants.VERSION, CACHE_VERSION], 'entries': self.entries, 'files': self.files}
+			with open(self.path, 'w') as f:
+				json.dump(manifest, f)
+		except Exception as e:
+			logging.warn(f'Could not write conversion cache {self.path}: {e}')
@@ -0,0 +1,134 @@
+"""
+Command line front-end for main.convert. Never imports the window, so it runs on machines without a display.
+
+Usage:
+	python -m psychtobase convert <mod> <output> --charts --songs ...
+"""
+
+import argparse
+import logging
+
+from . import Constants, files, log
+from copy import deepcopy
+from pathlib import Path
+
+# Flag name, options group (None for top-level options), option key, help
+_OPTION_FLAGS = [
+	('events', 'charts', 'events', 'Convert "Play Animation", "Alt Animation" notes and "Change Character" events.'),
+	('inst', 'songs', 'inst', 'Copy over "Inst.ogg" files.'),
+	('voices', 'songs', 'voices', 'Copy over "Voices.ogg" files.'),
+	('split', 'songs', 'split', 'Split "Voices.ogg" files using their charts. Requires ffmpeg and --charts.'),
+	('music', 'songs', 'music', 'Copy over the "music" directory.'),
+	('sounds', 'songs', 'sounds', 'Copy over the "sounds" directory.'),
+	('icons', 'characters', 'icons', 'Copy health icons and generate Freeplay icons.'),
+	('character-json', 'characters', 'json', 'Convert character .json files.'),
+	('character-assets', 'characters', 'assets', 'Copy character .png and .xml files.'),
+	('props', 'weeks', 'props', 'Copy menu character (prop) assets.'),
+	('levels', 'weeks', 'levels', 'Convert week .json files to levels.'),
+	('titles', 'weeks', 'titles', 'Copy week title images.'),
+	('stages', None, 'stages', 'Convert stage .json files and parse their .lua files.'),
+	('meta', None, 'modpack_meta', 'Convert "pack.json", "pack.png" and "credits.txt".'),
+	('images', None, 'images', 'Copy the "images" directory.'),
+]
+
+# Shorthands enabling a whole options group, like the checkboxes in the window.
+# Vocal split is left out as it needs ffmpeg, pass --split for it.
+_GROUP_FLAGS = {
+	'charts': ('Convert all charts.', {'charts': ['songs']}),
+	'songs': ('Copy all audio, except vocal split.', {'songs': ['inst', 'voices', 'music', 'sounds']}),
+	'characters': ('Convert characters, icons and assets.', {'characters': ['icons', 'json', 'assets']}),
+	'weeks': ('Convert levels, props and titles.', {'weeks': ['props', 'levels', 'titles']}),
+}
+
+def buildParser() -> argparse.ArgumentParser:
+	parser = argparse.ArgumentParser(prog='psychtobase', description=f'FNF Porter v{Constants.VERSION}')
+	commands = parser.add_subparsers(dest='command', required=True)
+
+	convert = commands.add_parser('convert', help='Convert a Psych Engine mod to the Base Game.')
+	convert.add_argument('mod', help='Path to your Psych Engine mod.')
+	convert.add_argument('output', help='Path to the Base Game mods folder.')
+	convert.add_argument('--all', action='store_true', help='Convert everything, except vocal split.')
+
+	for flag, (description, _) in _GROUP_FLAGS.items():
+		convert.add_argument(f'--{flag}', action='store_true', help=description)
+
+	for flag, _, _, description in _OPTION_FLAGS:
+		convert.add_argument(f'--{flag}', action='store_true', help=description)
+
+	convert.add_argument('--compact', action='store_true', help='Write JSON files without indentation, making them smaller.')
+	convert.add_argument('--trace', action='store_true', help='Log every call and argument the stage .lua parser reads. Slow on big scripts.')
+	convert.add_argument('--profile', metavar='FILE', help='Write a Chrome trace of the conversion to FILE, to open in Perfetto (ui.perfetto.dev) or chrome://tracing.')
+	convert.add_argument('--no-cache', action='store_true', help='Convert everything again, even files that did not change since the last conversion.')
+	convert.add_argument('--split-mode', choices=['ffmpeg', 'numpy'], default=Constants.DEFAULT_OPTIONS['songs']['splitMode'], help='How vocal split writes its files.')
+	convert.add_argument('--stream-charts', action='store_true', help='Load one difficulty at a time, reading huge charts bit by bit if ijson is installed. Uses less memory.')
+	convert.add_argument('--no-vectorize', action='store_true', help='Convert notes one by one instead of with NumPy. Slower, gives the same charts.')
+	convert.add_argument('--jobs', type=int, default=Constants.DEFAULT_OPTIONS['charts']['jobs'], metavar='N', help='How many songs to convert at once, each on its own process.')
+
+	copy = Constants.DEFAULT_OPTIONS['copy']
+	convert.add_argument('--copy-mode', choices=files.COPY_MODES, default=copy['mode'], help='How assets are copied. hardlink and reflink take no extra space, and fall back to copying when the drive can\'t do them.')
+	convert.add_argument('--skip-identical', choices=files.SKIP_MODES + ['none'], default=copy['skip'] or 'none', help='Don\'t copy assets already in the output, comparing size and date (stat) or contents (hash).')
+	convert.add_argument('--copy-workers', type=int, default=copy['workers'], metavar='N', help='How many files of a folder are copied at once.')
+
+	workers = Constants.DEFAULT_OPTIONS['workers']
+	convert.add_argument('--workers', type=int, default=workers['count'], metavar='N', help='How many stages can run at once.')
+	convert.add_argument('--worker-kind', choices=['thread', 'process'], default=workers['kind'], help='Run stages on threads or processes.')
+
+	return parser
+
+def buildOptions(args:argparse.Namespace) -> dict:
+	"""
+	Turns parsed arguments into the same options structure the window passes to main.convert.
+
+	Args:
+		args (argparse.Namespace): Arguments from buildParser.
+	"""
+	options = deepcopy(Constants.DEFAULT_OPTIONS)
+
+	def enable(group, key):
+		if group is None:
+			options[key] = True
+		else:
+			options[group][key] = True
+
+	for flag, (_, groups) in _GROUP_FLAGS.items():
+		if args.all or getattr(args, flag):
+			for group, keys in groups.items():
+				for key in keys:
+					enable(group, key)
+
+	for flag, group, key, _ in _OPTION_FLAGS:
+		if getattr(args, flag.replace('-', '_')) or (args.all and key != 'split'):
+			enable(group, key)
+
+	options['cache'] = not args.no_cache
+	options['compact'] = args.compact
+	options['trace'] = args.trace
+	options['profile'] = args.profile
+	options['songs']['splitMode'] = args.split_mode
+	options['charts']['jobs'] = args.jobs
+	options['charts']['stream'] = args.stream_charts
+	options['charts']['vectorize'] = not args.no_vectorize
+	options['copy']['mode'] = args.copy_mode
+	options['copy']['skip'] = None if args.skip_identical == 'none' else args.skip_identical
+	options['copy']['workers'] = args.copy_workers
+	options['workers']['count'] = args.workers
+	options['workers']['kind'] = args.worker_kind
+
+	return options
+
+def main(argv:list = None) -> int:
+	args = buildParser().parse_args(argv)
+
+	log.setup(gui=False)
+
+	if not Path(args.mod).is_dir():
+		logging.error(f'Mod folder {args.mod} does not exist!')
+		return 1
+
+	if Path(args.output).exists():
+		logging.warn(f'Folder {args.output} already existed before porting, files may have been overwritten.')
+
+	import main as porter
+	porter.convert(args.mod, args.output, buildOptions(args))
+
+	return 0
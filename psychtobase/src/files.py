@@ -1,7 +1,33 @@
+import hashlib
 import logging
+import os
+import shutil
+import time
 
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
 from glob import glob
 from pathlib import Path
+from typing import NamedTuple
+
+from . import progress
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+
+# ioctl asking the filesystem to share the source's blocks (btrfs, XFS, bcachefs...)
+FICLONE = 0x40049409
+
+COPY_MODES = ['copy', 'hardlink', 'reflink']
+SKIP_MODES = ['stat', 'hash']
+
+copySettings = {
+    'mode': 'copy', # 'copy', 'hardlink' or 'reflink'
+    'skip': None, # Skip files already at the destination: 'stat' (same size and date), 'hash' (same contents) or None
+    'workers': 8 # Threads copying the files of a folder
+}
 
 def removeTrail(filename):
     return filename.replace('.json', '')
@@ -13,4 +39,282 @@ def findAll(folder):
 def folderMake(folder_path):
     folder = Path(folder_path)
     if not folder.exists():
-        folder.mkdir(parents=True)
\ No newline at end of file
+        folder.mkdir(parents=True)
+
+class InventoryEntry(NamedTuple):
+    path: str
+    name: str
+    isDir: bool
+    size: int
+    mtime: int # st_mtime_ns
+
+def _key(path) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+class ModInventory:
+    """
+    Every file and folder of a mod, found in a single os.scandir pass along with their type and stat.
+    Stages look paths up here instead of globbing and checking each one on the disk.
+
+    Folders outside the mod, or behind symlinks, are scanned the first time they are asked for.
+
+    Args:
+        root (str): Path to the mod folder.
+    """
+    def __init__(self, root:str):
+        self.root = root
+        self.folders = {} # Folder key: entries in it
+        self.entries = {} # Path key: entry
+
+        start = time.time()
+        pending = [root]
+        while pending:
+            folder = pending.pop()
+            for entry in self._scan(folder):
+                if entry.isDir and not os.path.islink(entry.path):
+                    pending.append(entry.path)
+
+        logging.info(f'Found {len(self.entries)} files and folders in {root}: Took {time.time() - start}s')
+
+    def _scan(self, folder) -> list:
+        found = []
+        try:
+            with os.scandir(folder) as scan:
+                for dirEntry in scan:
+                    try:
+                        isDir = dirEntry.is_dir()
+                        stat = dirEntry.stat()
+                    except OSError: # Broken symlink
+                        continue
+
+                    entry = InventoryEntry(os.path.join(folder, dirEntry.name), dirEntry.name, isDir, stat.st_size, stat.st_mtime_ns)
+                    found.append(entry)
+                    self.entries[_key(entry.path)] = entry
+        except OSError:
+            pass
+
+        self.folders[_key(folder)] = found
+        return found
+
+    def list(self, folder) -> list:
+        """
+        Entries directly inside a folder, in the order os.scandir gave them. Empty if it doesn't exist.
+        """
+        found = self.folders.get(_key(folder))
+        if found == None:
+            found = self._scan(folder)
+        return found
+
+    def findAll(self, pattern:str) -> list:
+        """
+        Same as findAll, for patterns with a wildcard in the last part only (like 'mod/data/*.json').
+        """
+        folder, name = os.path.split(pattern)
+        # glob leaves hidden files out unless asked for them
+        hidden = name.startswith('.')
+
+        return [os.path.join(folder, entry.name) for entry in self.list(folder or '.')
+            if fnmatch(entry.name, name) and (hidden or not entry.name.startswith('.'))]
+
+    def get(self, path) -> InventoryEntry:
+        """
+        The entry of a path, None if it doesn't exist.
+        """
+        key = _key(path)
+        if key not in self.entries:
+            self.list(os.path.dirname(key))
+        return self.entries.get(key)
+
+    def exists(self, path) -> bool:
+        return self.get(path) != None
+
+    def isDir(self, path) -> bool:
+        entry = self.get(path)
+        return entry != None and entry.isDir
+
+    def isFile(self, path) -> bool:
+        entry = self.get(path)
+        return entry != None and not entry.isDir
+
+    def walk(self, folder) -> list:
+        """
+        Every file and folder under a folder.
+
+        Returns:
+            list: (folder it is in relative to the top one, entry) tuples.
+        """
+        found = []
+        pending = [('.', folder)]
+        while pending:
+            relative, current = pending.pop()
+            for entry in self.list(current):
+                found.append((relative, entry))
+                if entry.isDir:
+                    pending.append((os.path.join(relative, entry.name), entry.path))
+        return found
+
+def configureCopy(settings:dict):
+    """
+    Sets how copyFile and copyTree copy, with a dict like copySettings. Missing keys are left alone.
+    """
+    copySettings.update({key: value for key, value in (settings or {}).items() if key in copySettings})
+
+def _hash(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def isIdentical(source, destination, skip:str) -> bool:
+    """
+    Checks if the destination already holds the source.
+
+    Args:
+        skip (str): 'stat' compares size and modification date, 'hash' compares contents.
+    """
+    try:
+        destinationStat = os.stat(destination)
+    except OSError:
+        return False
+
+    sourceStat = os.stat(source)
+
+    if os.path.samestat(sourceStat, destinationStat):
+        return True
+    if sourceStat.st_size != destinationStat.st_size:
+        return False
+    if skip == 'stat':
+        return sourceStat.st_mtime_ns == destinationStat.st_mtime_ns
+    if skip == 'hash':
+        return _hash(source) == _hash(destination)
+
+    return False
+
+def _reflink(source, destination):
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        if fcntl != None:
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return
+            except OSError:
+                pass
+
+        # Not supported here, copy in the kernel instead (which still clones on some filesystems)
+        if hasattr(os, 'copy_file_range'):
+            remaining = os.fstat(src.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+            if remaining == 0:
+                return
+            src.seek(0)
+            dst.seek(0)
+            dst.truncate()
+
+        shutil.copyfileobj(src, dst)
+
+def _sameFile(source, destination) -> bool:
+    try:
+        return os.path.samestat(os.stat(source), os.stat(destination))
+    except OSError:
+        return False
+
+def copyFile(source, destination, mode:str = None, skip:str = None) -> str:
+    """
+    Copies a file with the copy engine. Falls back to a plain copy when the mode is not supported.
+
+    Args:
+        source (str): Path to the file.
+        destination (str): Path to where the file should go.
+        mode (str): 'copy', 'hardlink' or 'reflink'. Defaults to copySettings.
+        skip (str): 'stat', 'hash' or None. Defaults to copySettings.
+
+    Returns:
+        str: 'skipped', 'linked', 'cloned' or 'copied'.
+    """
+    progress.check()
+
+    mode = mode or copySettings['mode']
+    skip = skip if skip != None else copySettings['skip']
+
+    if skip and isIdentical(source, destination, skip):
+        return 'skipped'
+
+    # The destination is the source itself (like a mod converted into its own folder), unlinking it would delete the mod's file
+    if _sameFile(source, destination):
+        return 'skipped'
+
+    # Never write through a hardlink from a previous run, it would change whatever file it is still linked to
+    if os.path.lexists(destination):
+        os.unlink(destination)
+
+    if mode == 'hardlink':
+        try:
+            os.link(source, destination)
+            return 'linked'
+        except OSError as e:
+            logging.info(f'Could not hardlink {source} ({e}), copying it instead')
+
+    done = 'copied'
+    if mode == 'reflink':
+        _reflink(source, destination)
+        done = 'cloned'
+    else:
+        shutil.copyfile(source, destination)
+
+    # Keeps the date so 'stat' can tell the file is already there next time
+    sourceStat = os.stat(source)
+    os.utime(destination, ns=(sourceStat.st_atime_ns, sourceStat.st_mtime_ns))
+    progress.copied(sourceStat.st_size)
+
+    return done
+
+def copyTree(source, destination, workers:int = None, inventory:ModInventory = None) -> dict:
+    """
+    Copies a folder into another, merging with what is already there. Files are copied on a thread pool.
+
+    Args:
+        source (str): Path to the folder.
+        destination (str): Path to where the folder should go.
+        workers (int): Threads copying files. Defaults to copySettings.
+        inventory (ModInventory): Lists the files from it instead of scanning the folder again.
+
+    Returns:
+        dict: How many files ended up 'skipped', 'linked', 'cloned', 'copied' or 'failed'.
+    """
+    if inventory == None:
+        inventory = ModInventory(source)
+
+    Path(destination).mkdir(parents=True, exist_ok=True)
+
+    pairs = []
+    for relative, entry in inventory.walk(source):
+        target = Path(destination) / relative / entry.name
+        if entry.isDir:
+            target.mkdir(parents=True, exist_ok=True)
+        else:
+            pairs.append((entry.path, target))
+
+    counts = {}
+    # Copy threads report to the conversion that started the copy
+    tracker = progress.current
+    tracker.addFiles(len(pairs))
+
+    def copy(pair):
+        tracker.check()
+        try:
+            done = copyFile(*pair)
+        except Exception as e:
+            logging.error(f'Could not copy {pair[0]}: {e}')
+            done = 'failed'
+        tracker.fileDone()
+        return done
+
+    with ThreadPoolExecutor(workers or copySettings['workers'], thread_name_prefix='copy') as pool:
+        for done in pool.map(copy, pairs):
+            counts[done] = counts.get(done, 0) + 1
+
+    return counts
@@ -0,0 +1,115 @@
+"""
+Reads and writes JSON with the fastest library installed: orjson, then ujson, then the json module.
+
+Indented output is laid out like json.dump's, but it is not the same byte for byte:
+- Non-ASCII text is written as UTF-8 (é) instead of escaped (\\u00e9), with every backend.
+- orjson and ujson write floats in their shortest form (1e16 and 1e-7 instead of 1e+16 and 1e-07). They read back as the same numbers.
+- NaN and Infinity are written like the json module does. orjson would turn them into null, so data holding them is written by json instead.
+
+With the 'compact' option there is no indentation and no spaces at all,
+which is faster to write and makes the files players download smaller.
+"""
+
+import json
+import logging
+import math
+
+try:
+	import orjson
+except ImportError:
+	orjson = None
+
+try:
+	import ujson
+except ImportError:
+	ujson = None
+
+BACKEND = 'orjson' if orjson != None else 'ujson' if ujson != None else 'json'
+
+settings = {
+	'compact': False
+}
+
+def configure(compact:bool = None):
+	if compact != None:
+		settings['compact'] = compact
+
+def loads(data):
+	"""
+	Parses JSON from a str or bytes.
+	Anything the fast libraries refuse (a BOM, NaN, ...) is handed to the json module, which is more lenient.
+	"""
+	try:
+		if orjson != None:
+			return orjson.loads(data)
+		if ujson != None:
+			return ujson.loads(data)
+	except (ValueError, TypeError):
+		pass
+
+	try:
+		return json.loads(data)
+	except UnicodeDecodeError:
+		# Not UTF-8, most likely saved by an old Windows editor
+		return json.loads(data.decode('latin-1'))
+
+def load(path):
+	with open(path, 'rb') as f:
+		return loads(f.read())
+
+def _default(obj):
+	# Compact containers, like Utils.NoteList, serialize as what they stand for
+	if hasattr(obj, 'toJson'):
+		return obj.toJson()
+	raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+def _hasNonFinite(obj) -> bool:
+	# Only called when orjson wrote a null, which is rare in the files the porter writes
+	if isinstance(obj, float):
+		return not math.isfinite(obj)
+	if isinstance(obj, dict):
+		return any(_hasNonFinite(value) for value in obj.values())
+	if isinstance(obj, (list, tuple)):
+		return any(_hasNonFinite(value) for value in obj)
+	if hasattr(obj, 'toJson'):
+		return _hasNonFinite(obj.toJson())
+	return False
+
+def dumpb(obj, indent:int = 4, compact:bool = None) -> bytes:
+	"""
+	Serializes an object to UTF-8 JSON. Objects with a toJson() method are written as what it returns.
+
+	Args:
+		obj: The object.
+		indent (int): Spaces per level, ignored when compact.
+		compact (bool): No indentation and no spaces after separators. Defaults to the 'compact' setting.
+	"""
+	if compact == None:
+		compact = settings['compact']
+
+	try:
+		if orjson != None and (compact or indent == 2):
+			# orjson can only indent with 2 spaces
+			data = orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS | (0 if compact else orjson.OPT_INDENT_2))
+			if b'null' not in data or not _hasNonFinite(obj):
+				return data
+			logging.debug('orjson would write NaN or Infinity as null, using json instead')
+		if ujson != None:
+			return ujson.dumps(obj, indent=0 if compact else indent, ensure_ascii=False, escape_forward_slashes=False, default=_default).encode()
+	except (TypeError, ValueError, OverflowError) as e:
+		logging.debug(f'{BACKEND} could not serialize, using json instead: {e}')
+
+	if compact:
+		return json.dumps(obj, separators=(',', ':'), ensure_ascii=False, default=_default).encode()
+	return json.dumps(obj, indent=indent, ensure_ascii=False, default=_default).encode()
+
+def dumps(obj, indent:int = 4, compact:bool = None) -> str:
+	return dumpb(obj, indent, compact).decode()
+
+def dump(obj, path, indent:int = 4, compact:bool = None):
+	"""
+	Writes an object to a JSON file, see dumpb.
+	"""
+	data = dumpb(obj, indent, compact)
+	with open(path, 'wb') as f:
+		f.write(data)
@@ -1,17 +1,54 @@
 """Utility tool for configuring the logger"""
 
+import atexit
 import logging
+import queue
 import sys
+import threading
 
-from . import window
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from time import strftime
 
+# Most lines the window's log view keeps, the log file always has all of them
+WINDOW_LINES = 2000
+
+# Lines waiting for the window, which takes them in batches on the GUI thread (see drainWindowLines).
+# Bounded, as lines the view would drop anyway don't need to wait for it
+_windowLines = deque(maxlen=WINDOW_LINES)
+
+def drainWindowLines() -> list:
+    """Takes every line logged since the last call. Safe while other threads are logging."""
+    lines = []
+    try:
+        while True:
+            lines.append(_windowLines.popleft())
+    except IndexError:
+        pass
+    return lines
+
 class CustomHandler(logging.StreamHandler):
     def emit(self, record):
         log_entry = self.format(record)
         print(log_entry)
-        window.window.logsLabel.append(log_entry)
+        # Never touches the widget, records can come from any thread
+        _windowLines.append(log_entry)
+
+class ConsoleHandler(logging.StreamHandler):
+    """Same output as CustomHandler, without the window. Used by the command line."""
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+class BufferedFileHandler(logging.FileHandler):
+    """FileHandler that leaves records in the file's buffer instead of flushing after each one. flush() writes them out."""
+    def emit(self, record):
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
         
 class LogMem():
     def __init__(self, log):
@@ -19,42 +56,130 @@ class LogMem():
         
 logMemory = LogMem('No file yet recorded')
 
-def setup() -> logging.RootLogger:
-	"""instance of Logger module, will be used for logging operations"""
+# Parent of the trace channels, records too chatty to keep on (like every argument the stage parser reads).
+# They are debug records, dropped here unless enableTrace was called.
+_traceRoot = logging.getLogger('trace')
+_traceRoot.setLevel(logging.CRITICAL + 1)
+
+def trace(name:str) -> logging.Logger:
+	"""Trace channel of a part of the converter, off by default.
+	Check isEnabledFor(logging.DEBUG) once before a hot loop, and pass arguments instead of f-strings so they are only formatted when it is on.
+
+	Args:
+		name (str): Name of the channel, like 'lua'.
+	"""
+	return _traceRoot.getChild(name)
+
+def enableTrace(enabled:bool = True):
+	_traceRoot.setLevel(logging.DEBUG if enabled else logging.CRITICAL + 1)
+
+def _logFormat() -> logging.Formatter:
+	return logging.Formatter("%(asctime)s: [%(filename)s:%(lineno)d] [%(levelname)s] %(message)s", "%H:%M:%S")
+
+# Writes the records of this process to the file and the console, on its own thread
+_listener = None
+_listenerLock = threading.Lock()
+
+def _listen(logger:logging.Logger, handlers:list):
+	global _listener
+
+	with _listenerLock:
+		if _listener != None:
+			_listener.stop()
+
+		# The logging thread only pays for putting the record in the queue
+		records = queue.SimpleQueue()
+		_listener = QueueListener(records, *handlers, respect_handler_level=True)
+		_listener.start()
+
+	logger.handlers.clear()
+	logger.addHandler(QueueHandler(records))
+
+def flush():
+	"""Writes out every record logged so far. Called when a conversion ends, on crashes and before opening the log file."""
+	with _listenerLock:
+		if _listener == None:
+			return
+
+		# Stopping waits for the queue to be empty, records logged meanwhile wait for the restart
+		_listener.stop()
+		for handler in _listener.handlers:
+			handler.flush()
+		_listener.start()
+
+def _stop():
+	global _listener
+	with _listenerLock:
+		if _listener != None:
+			_listener.stop()
+			_listener = None
+
+atexit.register(_stop)
+
+def setup(gui:bool = True) -> logging.RootLogger:
+	"""instance of Logger module, will be used for logging operations
+	Records are written to the file and the console by a QueueListener thread, see flush.
+
+	Args:
+		gui (bool): Mirror records into the window's log view. Disable it for headless runs.
+	"""
 	
 	# logger config
 	logger = logging.getLogger()
 	logger.setLevel(logging.DEBUG)
 
 	# log format
-	log_format = logging.Formatter("%(asctime)s: [%(filename)s:%(lineno)d] [%(levelname)s] %(message)s", "%H:%M:%S")
+	log_format = _logFormat()
 
 	try: Path("logs").mkdir(exist_ok=True)
 	except: pass
      
 	# file handler
 	log_file = f"""logs/fnf-porter-{strftime("%Y-%m-%d_%H-%M-%S")}.log"""
-	file_handler = logging.FileHandler(log_file)
+	file_handler = BufferedFileHandler(log_file)
 	file_handler.setFormatter(log_format)
      
 	logMemory.current_log_file = log_file
 
     # console handler
-	console_handler = CustomHandler()
+	console_handler = CustomHandler() if gui else ConsoleHandler()
 	console_handler.setFormatter(log_format)
 
-	logger.handlers.clear()
-	logger.addHandler(file_handler)
-	logger.addHandler(console_handler)
+	_listen(logger, [file_handler, console_handler])
 	logger.info("Logger initialized!")
 
 	return logger
 
+def setupWorker(log_file:str = None) -> logging.RootLogger:
+	"""Logger for worker processes, which can't reach the window. Appends to the parent's log file.
+	Handlers write right away here, pool workers exit without running atexit so a buffer could be lost.
+
+	Args:
+		log_file (str): Log file of the parent process, if it has one.
+	"""
+	logger = logging.getLogger()
+	logger.setLevel(logging.DEBUG)
+	logger.handlers.clear()
+
+	log_format = _logFormat()
+	handlers = [ConsoleHandler()]
+
+	if log_file and Path(log_file).exists():
+		handlers.append(logging.FileHandler(log_file, 'a'))
+		logMemory.current_log_file = log_file
+
+	for handler in handlers:
+		handler.setFormatter(log_format)
+		logger.addHandler(handler)
+
+	return logger
+
 def log_exception(exc_type, exc_value, exc_traceback):
     """Log uncaught exceptions."""
     logger = logging.getLogger()
     if not issubclass(exc_type, KeyboardInterrupt):
         logger.error("Uncaught exception", exc_info=(exc_type, exc_value, exc_traceback))
+    flush()
 
 # Configure global exception handler to use the logger
 sys.excepthook = log_exception
\ No newline at end of file
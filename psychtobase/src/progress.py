@@ -0,0 +1,138 @@
+"""
+How far the running conversion is, and the switch to cancel it.
+
+Stages report to the module level functions between files, which also stop the stage once the conversion was cancelled.
+Nothing is tracked unless main.convert was given a Progress, so the command line pays next to nothing for it.
+"""
+
+import threading
+import time
+
+class Cancelled(BaseException):
+	"""
+	Raised between files once the conversion was cancelled.
+	Not an Exception, so the try excepts around every file let it through like a KeyboardInterrupt.
+	"""
+
+class Progress:
+	"""
+	Counts the stages, files and bytes of a conversion. Safe to update from any thread.
+
+	Process workers can't reach it, work they do is counted once it comes back.
+
+	Args:
+		onChange (callable): Called as onChange(snapshot) when something changed, at most every `interval` seconds.
+			It runs on whichever thread made the change.
+		interval (float): Seconds between two onChange calls, the last change of a stage is always reported.
+	"""
+	def __init__(self, onChange = None, interval:float = 0.1):
+		self.onChange = onChange
+		self.interval = interval
+
+		self._cancel = threading.Event()
+		self._lock = threading.Lock()
+		self._lastChange = 0
+
+		self.stages = [] # Stages running right now
+		self.stagesDone = 0
+		self.stagesTotal = 0
+		self.filesDone = 0
+		self.filesTotal = 0
+		self.bytesCopied = 0
+
+	def cancel(self):
+		self._cancel.set()
+
+	def cancelled(self) -> bool:
+		return self._cancel.is_set()
+
+	def check(self):
+		if self._cancel.is_set():
+			raise Cancelled()
+
+	def snapshot(self) -> dict:
+		with self._lock:
+			return {
+				'stage': ', '.join(self.stages),
+				'stagesDone': self.stagesDone,
+				'stagesTotal': self.stagesTotal,
+				'filesDone': self.filesDone,
+				'filesTotal': self.filesTotal,
+				'bytesCopied': self.bytesCopied,
+				'cancelled': self.cancelled()
+			}
+
+	def _update(self, force:bool = False, **changes):
+		with self._lock:
+			for key, value in changes.items():
+				setattr(self, key, getattr(self, key) + value)
+
+			now = time.monotonic()
+			if not force and now - self._lastChange < self.interval:
+				return
+			self._lastChange = now
+
+		if self.onChange != None:
+			self.onChange(self.snapshot())
+
+	def startStage(self, name:str):
+		with self._lock:
+			self.stages.append(name)
+		self._update(True)
+
+	def finishStage(self, name:str):
+		with self._lock:
+			if name in self.stages:
+				self.stages.remove(name)
+		self._update(True, stagesDone=1)
+
+	def addStages(self, count:int):
+		self._update(True, stagesTotal=count)
+
+	def addFiles(self, count:int):
+		self._update(filesTotal=count)
+
+	def fileDone(self):
+		self._update(filesDone=1)
+
+	def addBytes(self, size:int):
+		self._update(bytesCopied=size)
+
+# Progress of the running conversion, an untracked one that never cancels when there's none
+current = Progress()
+
+def track(tracker:Progress = None) -> Progress:
+	"""
+	Sets the Progress the next conversion reports to, a new untracked one if None.
+	"""
+	global current
+	current = tracker if tracker != None else Progress()
+	return current
+
+def check():
+	"""
+	Raises Cancelled if the conversion was cancelled.
+	"""
+	current.check()
+
+def cancelled() -> bool:
+	return current.cancelled()
+
+def copied(size:int):
+	current.addBytes(size)
+
+def each(items, total:int = None):
+	"""
+	Goes through the items of a stage, counting each as a file and stopping there if the conversion is cancelled.
+
+	Args:
+		items: What the stage goes through. Iterators need `total`.
+		total (int): How many items there are, defaults to len(items).
+	"""
+	tracker = current
+	tracker.addFiles(len(items) if total == None else total)
+
+	for item in items:
+		tracker.check()
+		yield item
+		tracker.fileDone()
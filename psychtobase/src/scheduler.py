@@ -0,0 +1,127 @@
+"""Runs the stages of a conversion on a worker pool, in the order their dependencies allow."""
+
+import logging
+import time
+
+from . import log, progress, tracing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+class Stage:
+    """
+    A step of the conversion.
+
+    Args:
+        name (str): Key of the stage, its result is stored under it.
+        func (callable): Called as func(context, results). Whatever it returns is its result.
+        after (list): Names of the stages that have to finish first. Their results are passed in `results`.
+        enabled (bool): Whether the user selected this stage.
+    """
+    def __init__(self, name:str, func, after:list = [], enabled:bool = True):
+        self.name = name
+        self.func = func
+        self.after = list(after)
+        self.enabled = enabled
+
+def _timed(func, name, context, results, setup = None):
+    if setup != None:
+        setup(context)
+
+    start = time.time()
+    with tracing.span(name, 'stage'):
+        result = func(context, results)
+    logging.info(f'Stage {name} done: Took {time.time() - start}s')
+    return result
+
+def _setupWorker(log_file:str, traceFile:str):
+    log.setupWorker(log_file)
+    tracing.setupWorker(traceFile)
+
+def makePool(workers:int, kind:str = 'thread'):
+    """
+    Creates the executor used for stages, also used by stages to spread their own work.
+
+    Args:
+        workers (int): Size of the pool.
+        kind (str): 'thread' or 'process'.
+    """
+    if kind == 'process':
+        # Workers can't reach the window, they log to the console and the current log file
+        return ProcessPoolExecutor(workers, initializer=_setupWorker, initargs=(log.logMemory.current_log_file, tracing.settings['file']))
+    return ThreadPoolExecutor(workers, thread_name_prefix='stage')
+
+def run(stages:list, context:dict, workers:int = 1, kind:str = 'thread', setup = None) -> dict:
+    """
+    Runs every stage once the stages it depends on are done. Dependencies on stages
+    that aren't in the list are ignored, so disabling charts doesn't hold up songs.
+
+    Args:
+        stages (list): Stages to run. With a single worker they run in this order.
+        context (dict): Passed to every stage. Has to be picklable for process pools.
+        workers (int): How many stages can run at once. 1 runs them one after another on this thread.
+        kind (str): 'thread' or 'process'.
+        setup (callable): Called as setup(context) before each stage, on the worker running it.
+            Process workers don't share module state with this one, so settings have to be applied there.
+
+    Stages are reported to progress.current. Once the conversion is cancelled no other stage starts,
+    and progress.Cancelled is raised when the ones running have stopped.
+
+    Returns:
+        dict: Results of the stages that finished, by name.
+    """
+    names = {stage.name for stage in stages}
+    waiting = list(stages)
+    dependencies = {stage.name: [dep for dep in stage.after if dep in names] for stage in stages}
+    finished = set()
+    results = {}
+
+    def ready():
+        return [stage for stage in waiting if all(dep in finished for dep in dependencies[stage.name])]
+
+    def inputs(stage):
+        return {dep: results[dep] for dep in dependencies[stage.name] if dep in results}
+
+    tracker = progress.current
+    tracker.addStages(len(stages))
+
+    def start(stage):
+        tracker.check()
+        tracker.startStage(stage.name)
+
+    def collect(stage, getResult):
+        try:
+            results[stage.name] = getResult()
+        except Exception as e:
+            logging.error(f'Stage {stage.name} failed: {e}')
+        finished.add(stage.name)
+        tracker.finishStage(stage.name)
+
+    if workers <= 1:
+        while waiting:
+            available = ready()
+            if not available:
+                raise ValueError(f'Stages {[stage.name for stage in waiting]} depend on each other')
+
+            stage = available[0]
+            waiting.remove(stage)
+            start(stage)
+            collect(stage, lambda: _timed(stage.func, stage.name, context, inputs(stage), setup))
+
+        return results
+
+    with makePool(workers, kind) as pool:
+        running = {}
+
+        while waiting or running:
+            for stage in ready():
+                waiting.remove(stage)
+                start(stage)
+                running[pool.submit(_timed, stage.func, stage.name, context, inputs(stage), setup)] = stage
+
+            if not running:
+                raise ValueError(f'Stages {[stage.name for stage in waiting]} depend on each other')
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                collect(running.pop(future), future.result)
+
+    return results
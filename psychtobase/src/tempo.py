@@ -0,0 +1,90 @@
+"""
+Timing of a Psych Engine song, shared by chart conversion and vocal split so they always agree.
+"""
+
+from bisect import bisect_right
+
+class TempoMap:
+	"""
+	Where every step and section of a song falls in time, built section by section.
+	Like Psych Engine's Conductor, a BPM change applies from the start of the section that has it.
+
+	Args:
+		bpm (float): BPM the song starts at.
+	"""
+	def __init__(self, bpm:float):
+		# Tempo segments: the step and millisecond they start at, and their BPM
+		self.changeSteps = [0]
+		self.changeTimes = [0]
+		self.bpms = [bpm]
+		self.stepCrochets = [15000 / bpm]
+
+		# Step and millisecond every section starts at
+		self.sectionSteps = []
+		self.sectionTimes = []
+
+		self.totalSteps = 0
+
+	@classmethod
+	def fromSections(cls, bpm:float, sections:list):
+		"""
+		Builds the map of a whole song.
+
+		Args:
+			bpm (float): BPM the song starts at.
+			sections (list): Dicts with 'lengthInSteps', 'changeBPM' and 'bpm', like ChartObject.sections.
+		"""
+		tempo = cls(bpm)
+		for section in sections:
+			tempo.addSection(section.get('lengthInSteps', 16), section.get('bpm', bpm) if section.get('changeBPM', False) else None)
+		return tempo
+
+	def addSection(self, lengthInSteps:float, bpm:float = None) -> float:
+		"""
+		Adds the next section of the song.
+
+		Args:
+			lengthInSteps (float): How long the section is.
+			bpm (float): The BPM it changes to, None if it doesn't.
+
+		Returns:
+			float: The millisecond the section starts at.
+		"""
+		step = self.totalSteps
+		time = self.msAtStep(step)
+
+		if bpm != None:
+			if self.changeSteps[-1] == step:
+				# Nothing played at the previous BPM
+				self.bpms[-1] = bpm
+				self.stepCrochets[-1] = 15000 / bpm
+			else:
+				self.changeSteps.append(step)
+				self.changeTimes.append(time)
+				self.bpms.append(bpm)
+				self.stepCrochets.append(15000 / bpm)
+
+		self.sectionSteps.append(step)
+		self.sectionTimes.append(time)
+		self.totalSteps += lengthInSteps
+
+		return time
+
+	def _segment(self, starts:list, value:float) -> int:
+		return max(bisect_right(starts, value) - 1, 0)
+
+	def msAtStep(self, step:float) -> float:
+		segment = self._segment(self.changeSteps, step)
+		return self.changeTimes[segment] + (step - self.changeSteps[segment]) * self.stepCrochets[segment]
+
+	def stepAtMs(self, ms:float) -> float:
+		segment = self._segment(self.changeTimes, ms)
+		return self.changeSteps[segment] + (ms - self.changeTimes[segment]) / self.stepCrochets[segment]
+
+	def sectionAtMs(self, ms:float) -> int:
+		"""
+		Index of the section playing at a millisecond, the first one before the song starts. -1 if there are no sections.
+		"""
+		if not self.sectionTimes:
+			return -1
+		return self._segment(self.sectionTimes, ms)
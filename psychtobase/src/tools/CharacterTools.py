@@ -1,8 +1,7 @@
 import copy
-import json
 import logging
 
-from .. import Constants, files
+from .. import Constants, files, jsonio
 from pathlib import Path
 
 # import lxml.etree as ET 
@@ -24,8 +23,7 @@ class CharacterObject:
 		self.loadCharacter()
 
 	def loadCharacter(self):
-		with open(self.pathName, 'r') as file:
-			self.psychCharacter = json.load(file)
+		self.psychCharacter = jsonio.load(self.pathName)
 
 		self.characterJson = files.removeTrail(self.characterFile)
 		self.characterName = ' '.join([string.capitalize() for string in self.characterJson.split('-')])
@@ -89,5 +87,6 @@ class CharacterObject:
 
 		logging.info(f'Character {self.characterName} saved to {savePath}.json')
 
-		with open(f'{savePath}.json', 'w') as f:
-			json.dump(self.character, f, indent=4)
\ No newline at end of file
+		jsonio.dump(self.character, f'{savePath}.json', indent=4)
+
+		return f'{savePath}.json'
\ No newline at end of file
@@ -1,11 +1,22 @@
 import logging
+import math
+import numpy as np
 
-from .. import Constants, files, Utils
+from .. import Constants, files, jsonio, tracing, Utils
 from ..Paths import Paths
+from ..tempo import TempoMap
+from .EventTools import EventConverter
 
+from array import array
 from copy import deepcopy
+from itertools import groupby
 from pathlib import Path
 
+try:
+	import ijson
+except ImportError:
+	ijson = None
+
 class ChartObject:
 	"""
 	A convenient way to store chart metadata.
@@ -13,8 +24,11 @@ class ChartObject:
 	Args:
 		path (str): The path where the song's chart data is stored.
 		output (str): The path where you want to save the song.
+		stream (bool): Load one difficulty at a time while converting, reading its sections one by one if ijson is installed.
+			Only a small header of every difficulty is kept around, instead of all of them at once.
+		vectorize (bool): Convert the notes of a difficulty all at once with NumPy (see vectorizeNotes).
 	"""
-	def __init__(self, path: str, output:str, EventsYesOrNO:bool) -> None:
+	def __init__(self, path: str, output:str, EventsYesOrNO:bool, stream:bool = False, vectorize:bool = True) -> None:
 		self.songPath = Path(path)
 		self.savePath = Path(output)
 
@@ -28,8 +42,15 @@ class ChartObject:
 		self.charts:dict = {}
 		self.difficulties:list = []
 
+		self.stream = stream
+		self.vectorize = vectorize
+		# Paths of the charts by difficulty when streaming, as self.charts only holds their headers then
+		self.chartFiles:dict = {}
+
 		self.chart:dict = deepcopy(Constants.BASE_CHART)
 		self.chart["events"] = []
+		# Shared by every source of events, so the same one is never added twice
+		self.eventConverter = EventConverter(self.chart["events"])
 
 		self.shouldConvertEvents = EventsYesOrNO # Unhinged variable name cuz were using so many variables
 
@@ -42,6 +63,7 @@ class ChartObject:
 
 		logging.info(f"Chart for {self.metadata.get('songName')} was created!")
 
+	@tracing.traced('chart')
 	def initCharts(self):
 		logging.info(f"Initialising charts for {self.songName}...")
 
@@ -72,11 +94,16 @@ class ChartObject:
 				difficulty = nameSplit[1]
 
 			filePath = self.songPath / fileName
-			fileJson = Paths.parseJson(filePath).get("song")
+
+			if self.stream:
+				fileJson = readChartHeader(Paths.json(filePath))
+			else:
+				fileJson = Paths.parseJson(filePath).get("song")
 
 			if fileJson != None:
 				unorderedDiffs.add(difficulty)
 				charts[difficulty] = fileJson
+				self.chartFiles[difficulty] = Paths.json(filePath)
 
 		for difficulty in Constants.DIFFICULTIES:
 			if difficulty in unorderedDiffs:
@@ -96,7 +123,6 @@ class ChartObject:
 		sampleChart = self.sampleChart
 
 		self.startingBpm = sampleChart.get('bpm')
-		self.stepCrochet = 15000 / self.startingBpm
 		
 		metadata = self.metadata
 		playData = metadata["playData"]
@@ -117,115 +143,133 @@ class ChartObject:
 		metadata["ratings"] = {diff: 0 for diff in self.difficulties} # Ratings don't do much now so :P
 		metadata["timeChanges"] = [Utils.timeChange(0, self.startingBpm, 4, 4, 0, [4]*4)]
 
+	def loadChart(self, difficulty:str) -> dict:
+		"""
+		The chart of a difficulty. When streaming, it is read from the disk again, with "notes" and "events"
+		yielding one item at a time if ijson can read the file.
+		"""
+		if not self.stream:
+			return self.charts[difficulty]
+
+		header = self.charts[difficulty]
+		file = self.chartFiles[difficulty]
+
+		if not header.get('streamable', False):
+			logging.info(f'Loading {file} whole, it can\'t be streamed')
+			return jsonio.load(file).get("song")
+
+		chart = dict(header)
+		chart["notes"] = streamItems(file, 'song.notes.item')
+		if chart.get("events") != None:
+			chart["events"] = streamItems(file, 'song.events.item')
+		return chart
+
 	def convertEvents(self, file):
 		logging.info(f"Events conversion for {self.songName} started!")
 
 		file = file.with_suffix('')
 		fileJson = Paths.parseJson(file)
-		events_data = fileJson.get("song", {}).get("events", [])
-
-		# Sometimes numbers are used instead of names
-		target_nums = {
-        	"0": "bf",
-        	"1": "dad",
-        	"2": "gf"
-    	}
-
-		for event in events_data:
-			time = event[0]
-			event_type = event[1][0][0]
-
-			if event_type == "Play Animation":
-				anim = event[1][0][1]
-				target = event[1][0][2].lower() # When the game is stupid and doesn't like capitalization
-				if str(target) in target_nums:
-					target = target_nums[str(target)]
-				else:
-					target = target.lower()
-				self.chart["events"].append(Utils.playAnimation(time, target, anim, True))
-			elif event_type == "Change Character":
-				target = event[1][0][1].lower()
-				char = event[1][0][2]
-				if str(target) in target_nums:
-					target = target_nums[str(target)]
-				else:
-					target = target.lower()
-				self.chart["events"].append(Utils.changeCharacter(time, target, char))
-			else:
-				logging.warn(f"Conversion for event {event_type} is not implemented!")
+		self.eventConverter.convert(fileJson.get("song", {}).get("events", []))
 
 		logging.info(f"Events conversion for {self.songName} complete!")
 
+	@tracing.traced('chart')
 	def convert(self):
 		logging.info(f"Chart conversion for {self.metadata.get('songName')} started!")
 
 		prevMustHit = self.sampleChart["notes"][0].get("mustHitSection", True)
-		prevTime = 0
+		# Not needed anymore, and it would keep a whole difficulty alive
+		self.sampleChart = None
 
-		events = self.chart["events"]
-		events.append(Utils.focusCamera(0, prevMustHit))
+		# Built from the sections of the first difficulty, vocal split rebuilds it from self.sections
+		tempo = self.tempo = TempoMap(self.startingBpm)
 
-		existing_events = set()
+		eventConverter = self.eventConverter
+		eventConverter.addFocusCamera(0, prevMustHit)
+		# Alt Animation of the last note that had one
+		anim = None
+		events = None
 
-		for i, (diff, cChart) in enumerate(self.charts.items()):
+		for i, diff in enumerate(list(self.charts)):
 			# cChart - convert Chart
-			self.chart["scrollSpeed"][diff] = cChart.get("speed")
-			notes = self.chart["notes"][diff] = []
+			cChart = self.loadChart(diff)
+			self.charts[diff] = None
 
-			steps = 0
+			self.chart["scrollSpeed"][diff] = cChart.get("speed")
+			notes = self.chart["notes"][diff] = Utils.NoteList()
 
-			prev_notes = set()
+			# Kept note times by (lane, whole millisecond). A note within 1ms can only be in the same or a neighbouring bucket
+			prev_notes = {}
 			total_duplicates = 0
 
-			for section in cChart.get("notes"):
-				mustHit = section.get("mustHitSection", True)
-				isDuet = False
-
-				for note in section.get("sectionNotes"):
-					strumTime = note[0]
-					noteData = note[1]
-					length = note[2]
-
-					if noteData < 0 and self.shouldConvertEvents: # Event notes (not yet supported, simply skipping them to keep the chart valid)
-						logging.warn(f'Tried converting legacy event "{length}". Legacy events are currently not supported. Sorry!')
-						continue
-
-					if not mustHit:
-						noteData = (noteData + 4) % 8 # We're shifting the notes! Basic arithmetic operations 🤓
+			sections = cChart.get("notes")
 
-						if not isDuet and noteData < 4:
-							isDuet = True
+			# Streamed sections only come one at a time, the vectorized path needs all of them
+			vectorized = None
+			if self.vectorize and isinstance(sections, list):
+				vectorized = vectorizeNotes(sections, self.shouldConvertEvents, anim)
 
-					# Backhands any dupe notes as Psych engine handles this in PlayState, base game doesn't
-					is_duplicate = any(
-						abs(existing_note[0] - strumTime) < 1 and existing_note[1] == noteData
-						for existing_note in prev_notes
-					)
+			if vectorized != None:
+				notes.extendColumns(*vectorized['columns'])
+				total_duplicates = vectorized['duplicates']
+				anim = vectorized['anim']
 
-					if is_duplicate:
-						total_duplicates += 1
-						continue
-
-					prev_notes.add((strumTime, noteData))
-
-					# Alt Singing Animation implementation using Play Animations!
-					if len(note) > 3 and note[3] == "Alt Animation": # Note types do not count as events, so they WILL be converted 🤓
-						target = "player" if noteData in range(4) else "opponent"
-						if noteData in [0, 4]:
-							anim = "singLEFT-alt"
-						elif noteData in [1, 5]:
-							anim = "singDOWN-alt"
-						elif noteData in [2, 6]:
-							anim = "singUP-alt"
-						elif noteData in [3, 7]:
-							anim = "singRIGHT-alt"
-						play_animation = (strumTime, target, anim)
+			for s, section in enumerate(sections):
+				mustHit = section.get("mustHitSection", True)
+				isDuet = False
 
-						if play_animation not in existing_events:
-							events.append(Utils.playAnimation(strumTime, target, anim, True)) #We should add a custom note type that plays the animation when the note is PRESSED.
-							existing_events.add(play_animation)
+				if vectorized != None:
+					isDuet = vectorized['duets'][s]
 
-					notes.append(Utils.note(noteData, length, strumTime))
+					for play_animation in vectorized['altAnimations'].get(s, ()):
+						eventConverter.addPlayAnimation(*play_animation)
+				else:
+					for note in section.get("sectionNotes"):
+						strumTime = note[0]
+						noteData = note[1]
+						length = note[2]
+
+						if noteData < 0 and self.shouldConvertEvents: # Event notes (not yet supported, simply skipping them to keep the chart valid)
+							logging.warn(f'Tried converting legacy event "{length}". Legacy events are currently not supported. Sorry!')
+							continue
+
+						if not mustHit:
+							noteData = (noteData + 4) % 8 # We're shifting the notes! Basic arithmetic operations 🤓
+
+							if not isDuet and noteData < 4:
+								isDuet = True
+
+						# Backhands any dupe notes as Psych engine handles this in PlayState, base game doesn't
+						bucket = math.floor(strumTime)
+						is_duplicate = any(
+							abs(existing_time - strumTime) < 1
+							for key in ((noteData, bucket - 1), (noteData, bucket), (noteData, bucket + 1))
+							for existing_time in prev_notes.get(key, ())
+						)
+
+						if is_duplicate:
+							total_duplicates += 1
+							continue
+
+						prev_notes.setdefault((noteData, bucket), []).append(strumTime)
+
+						# Alt Singing Animation implementation using Play Animations!
+						if len(note) > 3 and note[3] == "Alt Animation": # Note types do not count as events, so they WILL be converted 🤓
+							target = "player" if noteData in range(4) else "opponent"
+							if noteData in [0, 4]:
+								anim = "singLEFT-alt"
+							elif noteData in [1, 5]:
+								anim = "singDOWN-alt"
+							elif noteData in [2, 6]:
+								anim = "singUP-alt"
+							elif noteData in [3, 7]:
+								anim = "singRIGHT-alt"
+
+							# Lanes past 8 keep the last anim, there's none to keep before the first one
+							if anim != None:
+								eventConverter.addPlayAnimation(strumTime, target, anim) #We should add a custom note type that plays the animation when the note is PRESSED.
+
+						notes.append(noteData, length, strumTime)
 
 				if i == 0:
 					# Genius
@@ -243,71 +287,41 @@ class ChartObject:
 						'changeBPM': changeBPM
 					})
 
+					sectionTime = tempo.addSection(lengthInSteps, bpm if changeBPM else None)
+
 					if (prevMustHit != mustHit):
-						events.append(Utils.focusCamera(prevTime + steps * self.stepCrochet, mustHit))
+						eventConverter.addFocusCamera(sectionTime, mustHit)
 						prevMustHit = mustHit
 
-					steps += lengthInSteps
-
 					if changeBPM:
-						prevTime += steps * self.stepCrochet
-						self.metadata["timeChanges"].append(Utils.timeChange(prevTime, bpm, sectionBeats, sectionBeats, 0, [sectionBeats]*4))
-						self.stepCrochet = 15000 / bpm
-						steps = 0
+						# The BPM changes where this section starts
+						beat = tempo.sectionSteps[-1] / 4
+						timeChanges = self.metadata["timeChanges"]
+						timeChange = Utils.timeChange(sectionTime, bpm, sectionBeats, sectionBeats, beat, [sectionBeats]*4)
+
+						if timeChanges[-1]["b"] == beat:
+							timeChanges[-1] = timeChange
+						else:
+							timeChanges.append(timeChange)
 
 			if total_duplicates > 0:
 				logging.warn(f"We found {total_duplicates} duplicate notes in '{diff}' difficulty data! Notes were successfully removed.")
 
+			# Only the events of the last difficulty are converted, the rest of its chart can go
+			events = cChart.get("events")
+			# Dropped before the next difficulty is loaded, so only one is in memory at a time
+			cChart = sections = vectorized = prev_notes = None
+
         # Process events within the chart file becuz fuck us
 		if self.shouldConvertEvents:
-			# Sometimes numbers are used instead of names
-			target_nums = {
-        		"0": "bf",
-        		"1": "dad",
-        		"2": "gf"
-    		}
-			if "events" in cChart:
-				for event in cChart["events"]:
-					time = event[0]
-
-					all_events = event[1]
-
-					for stacked_event in all_events:
-						event_type = stacked_event[0]
-
-						if event_type == "Play Animation":
-							anim = stacked_event[1]
-							target = stacked_event[2].lower()
-
-							if str(target) in target_nums:
-								target = target_nums[str(target)]
-							else:
-								target = target.lower()
-
-							play_animation = (time, target, anim, True)
-
-							if play_animation not in existing_events:
-								events.append(Utils.playAnimation(time, target, anim, True))
-								existing_events.add(play_animation)
-						elif event_type == "Change Character":
-							target = stacked_event[1].lower()
-							char = stacked_event[2]
-
-							if str(target) in target_nums:
-								target = target_nums[str(target)]
-							else:
-								target = target.lower()
-
-							change_character = (time, target, char)
-
-							if change_character not in existing_events:
-								events.append(Utils.changeCharacter(time, target, char))
-								existing_events.add(change_character)
-						else:
-							logging.warn(f"Conversion for event {event_type} is not implemented!")
+			if events != None:
+				eventConverter.convert(events)
+
+		eventConverter.sort()
 
 		logging.info(f"Chart conversion for {self.metadata.get('songName')} was completed!")
 
+	@tracing.traced('chart')
 	def save(self):
 		# In case there were issues in how the Song was previously named, we save it under a new name!
 		newSongFile = Utils.formatToSongPath(self.songName)
@@ -316,10 +330,264 @@ class ChartObject:
 		saveDir = f'{self.savePath}{folder}'
 		files.folderMake(saveDir)
 
-		output = Paths.join(saveDir, f'{self.songFile}-metadata')
-		Paths.writeJson(output, self.metadata, 2)
+		metadataOutput = Paths.join(saveDir, f'{self.songFile}-metadata')
+		Paths.writeJson(metadataOutput, self.metadata, 2)
+
+		chartOutput = Paths.join(saveDir, f'{newSongFile}-chart')
+		Paths.writeJson(chartOutput, self.chart, 2)
 
-		output = Paths.join(saveDir, f'{newSongFile}-chart')
-		Paths.writeJson(output, self.chart, 2)
+		logging.info(f"[{newSongFile}] Saving {self.songName} to {saveDir}")
 
-		logging.info(f"[{newSongFile}] Saving {self.songName} to {saveDir}")
\ No newline at end of file
+		# The files that were written
+		return [Paths.json(metadataOutput), Paths.json(chartOutput)]
+
+def streamItems(file:str, prefix:str):
+	"""
+	Yields the items of a JSON array one at a time, without loading the rest of the file.
+
+	Args:
+		file (str): Path to the JSON file.
+		prefix (str): ijson prefix of the items, like 'song.notes.item'.
+	"""
+	with open(file, 'rb') as f:
+		yield from ijson.items(f, prefix, use_float=True)
+
+def readChartHeader(file:str) -> dict:
+	"""
+	Reads what a Psych Engine chart has besides its notes: the values in "song" and those of its first section.
+	The sections and events are skipped over with ijson when it is installed, else the whole file is parsed and dropped.
+
+	Returns:
+		dict: The values, with "notes" holding the first section without its notes, or None if there is no "song".
+			"events" is only set (to True) if the chart has any. "streamable" tells if ijson could read the file.
+	"""
+	if ijson != None:
+		try:
+			return _scanChartHeader(file)
+		except Exception as e:
+			# Broken or non-standard JSON (NaN, a BOM...), the lenient parser can still read it
+			logging.warn(f'Could not stream {file}, it will be loaded whole: {e}')
+
+	song = jsonio.load(file).get("song")
+	if song == None:
+		return None
+
+	header = {key: value for key, value in song.items() if key not in ("notes", "events")}
+	header["notes"] = [{key: value for key, value in section.items() if key != "sectionNotes"} for section in song.get("notes", [])[:1]]
+	if "events" in song:
+		header["events"] = True
+	header["streamable"] = False
+	return header
+
+def _scanChartHeader(file:str) -> dict:
+	header = None
+	firstSection = None
+	sections = 0
+
+	with open(file, 'rb') as f:
+		for prefix, event, value in ijson.parse(f, use_float=True):
+			# Most of the file, skipped as early as possible
+			if prefix == 'song.notes.item.sectionNotes.item.item' or prefix == 'song.events.item.item.item.item':
+				continue
+
+			if prefix == 'song':
+				if event == 'start_map':
+					header = {}
+				continue
+
+			if header == None or event in ('end_map', 'end_array', 'map_key'):
+				continue
+
+			if prefix == 'song.notes.item' and event == 'start_map':
+				sections += 1
+				if sections == 1:
+					firstSection = {}
+			elif prefix == 'song.events' and event == 'start_array':
+				header["events"] = True
+			elif prefix.count('.') == 1 and event not in ('start_map', 'start_array'):
+				header[prefix[5:]] = value
+			elif sections == 1 and prefix.startswith('song.notes.item.') and prefix.count('.') == 3 and event not in ('start_map', 'start_array'):
+				firstSection[prefix[16:]] = value
+
+	if header == None:
+		return None
+
+	header["notes"] = [firstSection] if firstSection != None else []
+	header["streamable"] = True
+	return header
+
+# Alt Animation anims by lane, both sides
+ALT_ANIMATIONS = ["singLEFT-alt", "singDOWN-alt", "singUP-alt", "singRIGHT-alt"] * 2
+
+def vectorizeNotes(sections:list, skipEventNotes:bool, anim:str = None) -> dict:
+	"""
+	Does what ChartObject.convert does to every note of a difficulty, on NumPy arrays of all of them at once:
+	lane shifting, duet detection, duplicate removal and Alt Animation lookup.
+	Gives the exact same notes and events as the loop.
+
+	Args:
+		sections (list): The Psych Engine sections of the difficulty.
+		skipEventNotes (bool): Drop legacy event notes (negative lanes), like when events are converted.
+		anim (str): Anim of the last Alt Animation note converted so far, which notes outside the 8 lanes reuse.
+
+	Returns:
+		dict: 'columns' for NoteList.extendColumns, 'duplicates' (how many were removed), 'duets' (by section),
+			'altAnimations' ((time, target, anim) by section) and 'anim'. None if the notes hold anything the arrays
+			can't reproduce exactly, the loop handles those.
+	"""
+	try:
+		sectionNotes = [section.get("sectionNotes") for section in sections]
+		flat = [note for notes in sectionNotes for note in notes]
+		count = len(flat)
+
+		data = [note[1] for note in flat]
+		times = [note[0] for note in flat]
+		lengths = [note[2] for note in flat]
+	except Exception:
+		return None
+
+	if set(map(type, data)) - {int} or set(map(type, times)) - {int, float} or set(map(type, lengths)) - {int, float, str}:
+		return None
+
+	sectionOf = np.repeat(np.arange(len(sections)), [len(notes) for notes in sectionNotes])
+	mustHit = np.array([bool(section.get("mustHitSection", True)) for section in sections], dtype=bool)
+
+	# Strings in place of a length count as no length
+	lengthIsStr = np.fromiter((type(length) == str for length in lengths), dtype=bool, count=count)
+
+	try:
+		lanes = np.array(data, dtype=np.int64).reshape(count)
+		noteTimes = np.array(times, dtype=np.float64).reshape(count)
+		noteLengths = np.array([0 if isStr else length for isStr, length in zip(lengthIsStr, lengths)], dtype=np.float64).reshape(count)
+	except OverflowError:
+		return None
+
+	timeIsInt = np.fromiter((type(time) == int for time in times), dtype=bool, count=count)
+	lengthIsInt = np.fromiter((type(length) == int for length in lengths), dtype=bool, count=count)
+
+	# math.floor fails on these in the loop, let it report them
+	if not np.isfinite(noteTimes).all() or (np.abs(noteTimes[timeIsInt]) >= 2 ** 53).any() or (np.abs(noteLengths[lengthIsInt]) >= 2 ** 53).any():
+		return None
+
+	isEvent = (lanes < 0) & skipEventNotes
+	shifted = ~mustHit[sectionOf]
+	lanes = np.where(shifted, (lanes + 4) % 8, lanes)
+
+	if ((lanes < -32768) | (lanes > 32767)).any():
+		return None
+
+	duets = np.zeros(len(sections), dtype=bool)
+	duets[sectionOf[shifted & (lanes < 4) & ~isEvent]] = True
+
+	# A note is a duplicate if it's within 1ms of an earlier kept note on its lane.
+	# Sorted by lane and time, notes more than 1ms from their neighbours can't be one. Only runs
+	# of notes close to each other need the loop's check, in chart order
+	keep = ~isEvent
+	candidates = np.flatnonzero(keep)
+	order = candidates[np.lexsort((noteTimes[candidates], lanes[candidates]))]
+	close = (lanes[order][1:] == lanes[order][:-1]) & (np.diff(noteTimes[order]) < 1)
+	duplicates = 0
+
+	if close.any():
+		runs = np.concatenate(([0], np.cumsum(~close)))
+		inRun = np.bincount(runs)[runs] > 1
+		for _, run in groupby(zip(runs[inRun].tolist(), order[inRun].tolist()), key=lambda pair: pair[0]):
+			keptTimes = []
+			for _, index in sorted(run, key=lambda pair: pair[1]):
+				if any(abs(existing - times[index]) < 1 for existing in keptTimes):
+					keep[index] = False
+					duplicates += 1
+				else:
+					keptTimes.append(times[index])
+
+	altAnimations = {}
+	for index, note in enumerate(flat):
+		if keep[index] and len(note) > 3 and note[3] == "Alt Animation":
+			lane = int(lanes[index])
+			if 0 <= lane < 8:
+				anim = ALT_ANIMATIONS[lane]
+			elif anim == None:
+				continue
+			altAnimations.setdefault(int(sectionOf[index]), []).append((times[index], "player" if 0 <= lane < 4 else "opponent", anim))
+
+	for index in np.flatnonzero(isEvent):
+		logging.warn(f'Tried converting legacy event "{lengths[index]}". Legacy events are currently not supported. Sorry!')
+
+	kept = np.flatnonzero(keep)
+	hasLength = (noteLengths[kept] != 0) & ~lengthIsStr[kept]
+	flags = timeIsInt[kept] * Utils.NoteList.TIME_INT | hasLength * Utils.NoteList.HAS_LENGTH | (hasLength & lengthIsInt[kept]) * Utils.NoteList.LENGTH_INT
+
+	columns = (
+		array('h', lanes[kept].astype(np.int16).tobytes()),
+		array('d', noteTimes[kept].tobytes()),
+		array('d', np.where(hasLength, noteLengths[kept], 0).tobytes()),
+		array('B', flags.astype(np.uint8).tobytes())
+	)
+
+	return {'columns': columns, 'duplicates': duplicates, 'duets': duets.tolist(), 'altAnimations': altAnimations, 'anim': anim}
+
+@tracing.traced('chart', 'path')
+def convertChart(path:str, output:str, events:bool, compact:bool = False, stream:bool = False, vectorize:bool = True) -> tuple:
+	"""
+	Loads, converts and saves the charts of a song. Lives at module level so it can run on a process pool.
+
+	Args:
+		path (str): The path where the song's chart data is stored.
+		output (str): The path where you want to save the song.
+		events (bool): If events should be converted.
+		compact (bool): Write the charts without indentation. Passed in as process workers don't share the main process' settings.
+		stream (bool): Load one difficulty at a time, see ChartObject.
+		vectorize (bool): Convert notes with NumPy, see ChartObject.
+
+	Returns:
+		tuple: The entry vocal split needs for this song (None if the charts couldn't be loaded) and the files written.
+	"""
+	logging.info(f'Loading charts in {path}')
+
+	jsonio.configure(compact)
+
+	# Try except to avoid any crash
+	try:
+		songChart = ChartObject(path, output, events, stream, vectorize)
+	except FileNotFoundError:
+		# If the charts arent found, this error will be thrown.
+		logging.warning(f"{path} data not found! Skipping...")
+		return None, []
+	except Exception as e:
+		# If any other Exception is found, throw a error
+		logging.error("Error creating ChartObject instance: " + str(e))
+		return None, []
+	else:
+		logging.info(f'{path} successfully initialized! Converting')
+
+	try:
+		songChart.convert()
+	except Exception as e:
+		logging.error(f'Could not convert chart {path}: {e}')
+		return None, []
+
+	entry = None
+
+	# Try except to avoid any crash
+	try:
+		entry = {
+			'songKey': songChart.songFile,
+			'sections': songChart.sections,
+			'bpm': songChart.startingBpm,
+			'player': songChart.metadata['playData']['characters']['player'],
+			'opponent': songChart.metadata['playData']['characters']['opponent']
+		}
+	except Exception as e:
+		logging.error(f'Could not create a chart entry for a chart: {e}')
+
+	logging.info(f'{path} charts converted, saving')
+
+	outputs = []
+
+	# Try except to avoid any crashes
+	try:
+		outputs = songChart.save()
+	except Exception as e:
+		logging.error(f'Could not save chart: {e}')
+
+	return entry, outputs
@@ -0,0 +1,130 @@
+"""
+Converts Psych Engine events to base game ones.
+
+Converters are looked up by the Psych event name in CONVERTERS, so supporting another event
+is just another function decorated with @converter, and doesn't add work for the others.
+"""
+
+import logging
+
+from .. import Utils
+from operator import itemgetter
+
+# Sometimes numbers are used instead of names
+TARGETS = {
+	"0": "bf",
+	"1": "dad",
+	"2": "gf"
+}
+
+# Psych event name: function(time, value1, value2) returning (dedupe key, base game event)
+CONVERTERS = {}
+
+def converter(name:str):
+	"""
+	Registers a function as the converter of a Psych event.
+
+	Args:
+		name (str): Name of the event in Psych Engine.
+	"""
+	def register(function):
+		CONVERTERS[name] = function
+		return function
+	return register
+
+def target(value) -> str:
+	target = str(value).lower() # When the game is stupid and doesn't like capitalization
+	return TARGETS.get(target, target)
+
+@converter("Play Animation")
+def playAnimation(time:float, anim:str, value2:str) -> tuple:
+	who = target(value2)
+	return ("PlayAnimation", time, who, anim), Utils.playAnimation(time, who, anim, True)
+
+@converter("Change Character")
+def changeCharacter(time:float, value1:str, char:str) -> tuple:
+	who = target(value1)
+	return ("Change Character", time, who, char), Utils.changeCharacter(time, who, char)
+
+class EventConverter:
+	"""
+	Adds converted events to a chart, leaving out the ones it already has (the same event, at the same time, with the same values).
+	One is shared by events.json, the events inside the charts, the camera focus of the sections and the alt animation notes of a song.
+
+	Args:
+		events (list): The base game events of the chart, added to in place.
+	"""
+	def __init__(self, events:list):
+		self.events = events
+		self.seen = set()
+
+	def add(self, key:tuple, event:dict):
+		if key not in self.seen:
+			self.seen.add(key)
+			self.events.append(event)
+
+	def addPlayAnimation(self, time:float, target:str, anim:str):
+		self.add(("PlayAnimation", time, target, anim), Utils.playAnimation(time, target, anim, True))
+
+	def addFocusCamera(self, time:float, char:bool):
+		self.add(("FocusCamera", time, char), Utils.focusCamera(time, char))
+
+	def sort(self):
+		"""
+		Sorts the events by time, so the game doesn't have to when loading the chart.
+		Events at the same time stay in the order they were added in.
+
+		Every source adds its events mostly in order already, list.sort merges those runs instead of sorting from scratch.
+		"""
+		try:
+			self.events.sort(key=itemgetter("t"))
+		except TypeError as e:
+			logging.warn(f"Could not sort events, leaving them as they are: {e}")
+
+	def convert(self, psychEvents):
+		"""
+		Converts every stacked event of every time slot.
+		Events with no converter are skipped, with one warning per event name saying how many were.
+
+		Args:
+			psychEvents: Psych events, [time, [[name, value1, value2], ...]] each. Any iterable works, like a streamed chart's.
+		"""
+		converters = CONVERTERS
+		seen = self.seen
+		append = self.events.append
+		# Events with no converter, and how many of each were skipped
+		unsupported = {}
+
+		for psychEvent in psychEvents:
+			try:
+				time, stacked = psychEvent[0], psychEvent[1]
+			except (IndexError, TypeError, KeyError):
+				stacked = None
+
+			if not isinstance(stacked, list):
+				logging.warn(f"Skipping malformed event {psychEvent}")
+				continue
+
+			for stackedEvent in stacked:
+				if not (isinstance(stackedEvent, (list, tuple)) and stackedEvent and isinstance(stackedEvent[0], str)):
+					logging.warn(f"Skipping malformed event {stackedEvent} at {time}")
+					continue
+
+				name = stackedEvent[0]
+				function = converters.get(name)
+				if function == None:
+					unsupported[name] = unsupported.get(name, 0) + 1
+					continue
+
+				try:
+					key, event = function(time, stackedEvent[1], stackedEvent[2])
+				except Exception as e:
+					logging.warn(f"Could not convert {name} event at {time}: {e}")
+					continue
+
+				if key not in seen:
+					seen.add(key)
+					append(event)
+
+		for name, count in unsupported.items():
+			logging.warn(f"Conversion for event {name} is not implemented! Skipped {count} of them.")
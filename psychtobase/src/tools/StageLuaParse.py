@@ -1,19 +1,120 @@
+import copy
+import hashlib
 import logging
+import re
+import time
 
 from . import StageTool
+from .. import log, tracing
 from luaparser import ast
 from luaparser.astnodes import *
 
+allowedMethods = ['makeLuaSprite', 'setScrollFactor', 'scaleObject', 'makeAnimatedLuaSprite', 'addAnimationByPrefix', 'addLuaSprite']
+allowedFuncs = ['onCreate', 'onCreatePost']
+
+# Scripts calling none of these can't have props, they aren't parsed at all
+methodsPattern = re.compile(r'\b(?:' + '|'.join(allowedMethods) + r')\b')
+
+# Comments, strings and words of a Lua script, enough to tell where its blocks start and end
+tokenPattern = re.compile(r'''
+    --\[(=*)\[.*?\]\1\]
+    | --[^\n]*
+    | \[(=*)\[.*?\]\2\]
+    | "(?:\\.|[^"\\\n])*"
+    | '(?:\\.|[^'\\\n])*'
+    | [A-Za-z_][A-Za-z0-9_]*
+''', re.S | re.X)
+functionNamePattern = re.compile(r'\s*(' + '|'.join(allowedFuncs) + r')\s*\(')
+
+# Props already parsed, by hash of the script. Emptied when a conversion starts, see clearCache
+_parsedStages = {}
+
+trace = log.trace('lua')
+
+def clearCache():
+    """
+    Forgets the scripts parsed so far, called by main.convert so every conversion parses its scripts again.
+    """
+    _parsedStages.clear()
+
+def extractFunctions(lua_script):
+    """
+    Cuts the onCreate and onCreatePost functions out of a script, so luaparser doesn't have to go through the rest.
+
+    Returns:
+        str: Their source, one after the other. None if the blocks of the script don't add up.
+    """
+    functions = []
+    depth = 0
+    start = None
+    previous = None
+
+    for token in tokenPattern.finditer(lua_script):
+        word = token.group()
+        before, previous = previous, word
+
+        if word in ('function', 'if', 'do', 'repeat'):
+            # Local functions aren't ones Psych Engine can call
+            if word == 'function' and depth == 0 and before != 'local' and functionNamePattern.match(lua_script, token.end()):
+                start = token.start()
+            depth += 1
+        elif word in ('end', 'until'):
+            depth -= 1
+            if depth < 0:
+                return None
+            if depth == 0 and start != None:
+                functions.append(lua_script[start:token.end()])
+                start = None
+
+    if depth != 0:
+        return None
+
+    return '\n'.join(functions)
+
+@tracing.traced('lua', 'lua_script_path')
 def parseStage(lua_script_path):
+    """
+    Reads the props of a stage from its Lua script.
+    Scripts are parsed once per conversion, a mod reusing the same script for other stages gets the same props again.
+    """
     lua_script = open(lua_script_path, 'r').read()
 
-    # Parse the Lua script into an AST
-    tree = ast.parse(lua_script)
+    scriptHash = hashlib.sha256(lua_script.encode()).hexdigest()
+    if scriptHash not in _parsedStages:
+        _parsedStages[scriptHash] = _parseStage(lua_script, lua_script_path)
+    else:
+        logging.info(f'{lua_script_path} was already parsed, using the same props')
 
-    calls = {}
+    return copy.deepcopy(_parsedStages[scriptHash])
+
+def _parseStage(lua_script, lua_script_path):
+    start = time.time()
+
+    if not methodsPattern.search(lua_script):
+        logging.info(f'{lua_script_path} has no props, not parsing it')
+        return []
+
+    tree = None
+
+    functions = extractFunctions(lua_script)
+    if functions == '':
+        logging.info(f'{lua_script_path} has no onCreate or onCreatePost function, not parsing it')
+        return []
+
+    if functions != None:
+        try:
+            tree = ast.parse(functions)
+        except Exception as e:
+            logging.info(f'Could not parse the functions of {lua_script_path} on their own, parsing the whole script: {e}')
 
-    allowedMethods = ['makeLuaSprite', 'setScrollFactor', 'scaleObject', 'makeAnimatedLuaSprite', 'addAnimationByPrefix', 'addLuaSprite']
-    allowedFuncs = ['onCreate', 'onCreatePost']
+    if tree == None:
+        # Parse the Lua script into an AST
+        tree = ast.parse(lua_script)
+
+    traceOn = trace.isEnabledFor(logging.DEBUG)
+    callCount = 0
+
+    calls = {}
 
     # Note: addLuaSprite only checks for if a character is after the characters!
 
@@ -41,7 +142,8 @@ def parseStage(lua_script_path):
                         #Me and the boys HATE Lua <3
                         # true.... better keep testing this!!!!! :imp:
                         try:
-                            logging.info(f'Starting conversion of lua type: {type(arg)}')
+                            if traceOn:
+                                trace.debug('Starting conversion of lua type: %s', type(arg))
                             match(type(arg)):
                                 case ast.String:
                                     arguments.append(arg.s)
@@ -94,6 +196,10 @@ def parseStage(lua_script_path):
                         calls[curFunc][node.func.id] = []
 
                     calls[curFunc][node.func.id].append(arguments)
+                    callCount += 1
+
+                    if traceOn:
+                        trace.debug('%s in %s: %s', node.func.id, curFunc, arguments)
 
             except Exception as e:
                 logging.error(f'Failed to assign arguments of this call: {e}')
@@ -102,7 +208,8 @@ def parseStage(lua_script_path):
     _newProps = []
 
     for key in calls.keys():
-        logging.info(f'Getting props of {key}')
+        if traceOn:
+            trace.debug('Getting props of %s', key)
         _props.extend(StageTool.getProps(calls[key], key, lua_script_path))
 
     try:
@@ -110,4 +217,6 @@ def parseStage(lua_script_path):
     except Exception as e:
         logging.error(f'Could not convert objects to FNF props: {e}')
 
+    logging.info(f'Parsed {lua_script_path}: {callCount} calls found, {len(_newProps)} props made, took {time.time() - start}s')
+
     return _newProps
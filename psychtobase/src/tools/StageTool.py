@@ -16,15 +16,32 @@ def convert(stageJSON, assetName, luaProps):
 
     return stageTemplate
 
+def _tagKey(tag):
+    # Tags read from a table or a field are dicts, which can't be dict keys themselves
+    return frozenset(tag.items()) if isinstance(tag, dict) else tag
+
+def _firstByTag(calls) -> dict:
+    # First call for each tag, like the first match a scan of the calls would find
+    found = {}
+    for call in calls:
+        if len(call) > 1:
+            found.setdefault(_tagKey(call[1]), call)
+    return found
+
 def getProps(parentFunc, parentFuncName, luaFilename):
     # onCreate props have a negative z index
     # onCreatePost props have a positive z index
     # if ANY prop has addLuaSprite(tag, TRUE) then the z index increases until it is over 300
 
     _props = []
+    # Tag: props made with it, more than one if the script reuses a tag
+    propsByTag = {}
 
     propArr = parentFunc.get('makeLuaSprite', []) + parentFunc.get('makeAnimatedLuaSprite', [])
 
+    scales = _firstByTag(parentFunc.get('scaleObject', []))
+    scrolls = _firstByTag(parentFunc.get('setScrollFactor', []))
+
     for index, pictureProp in enumerate(propArr):
         tag = pictureProp[1]
         sprite = pictureProp[2]
@@ -39,15 +56,15 @@ def getProps(parentFunc, parentFuncName, luaFilename):
         except:
             logging.error(f'[{luaFilename}] Failed accessing x and y of prop! Did you check if it is defined?')
 
-        for func in parentFunc.get('scaleObject', []):
-            if func[1] == tag:
-                scale = [float(func[2]), float(func[3])]
-                break
-        
-        for func in parentFunc.get('setScrollFactor', []):
-            if func[1] == tag:
-                scroll = [float(func[2]), float(func[3])]
-                break
+        key = _tagKey(tag)
+
+        func = scales.get(key)
+        if func != None:
+            scale = [float(func[2]), float(func[3])]
+
+        func = scrolls.get(key)
+        if func != None:
+            scroll = [float(func[2]), float(func[3])]
 
         call = pictureProp[0]
 
@@ -55,7 +72,7 @@ def getProps(parentFunc, parentFuncName, luaFilename):
         if call == 'makeAnimatedLuaSprite':
             animated = True
 
-        _props.append({
+        prop = {
             't': tag, # Tag
             's': sprite, # Sprite
             'x': pos[0], # X
@@ -65,7 +82,9 @@ def getProps(parentFunc, parentFuncName, luaFilename):
             'as': [], # Animations
             'scale': scale, # Scale
             'scroll': scroll # Scroll
-        })
+        }
+        _props.append(prop)
+        propsByTag.setdefault(key, []).append(prop)
 
     for animationAdd in parentFunc.get('addAnimationByPrefix', []):
         tag = animationAdd[1]
@@ -79,24 +98,22 @@ def getProps(parentFunc, parentFuncName, luaFilename):
         if len(animationAdd) >= 6:
             loop = animationAdd[5]
 
-        for prop in _props:
-            if prop['t'] == tag:
-                prop['as'].append({
-                    'an': animName,
-                    'p': prefix,
-                    'f': fps,
-                    'l': loop
-                })
-        
-    addSpriteOrder = [addProp[1] for addProp in parentFunc.get('addLuaSprite', [])]
-
-    for i, tag in enumerate(addSpriteOrder):
-        for prop in _props:
-            if prop['t'] == tag:
-                if len(parentFunc.get('addLuaSprite', [])[i]) > 2 and parentFunc.get('addLuaSprite', [])[i][2]:
-                    prop['z'] = 300 + i
-                else:
-                    prop['z'] = i - len(addSpriteOrder)
+        for prop in propsByTag.get(_tagKey(tag), ()):
+            prop['as'].append({
+                'an': animName,
+                'p': prefix,
+                'f': fps,
+                'l': loop
+            })
+
+    addLuaSprite = parentFunc.get('addLuaSprite', [])
+
+    for i, addProp in enumerate(addLuaSprite):
+        for prop in propsByTag.get(_tagKey(addProp[1]), ()):
+            if len(addProp) > 2 and addProp[2]:
+                prop['z'] = 300 + i
+            else:
+                prop['z'] = i - len(addLuaSprite)
 
     return _props
 
@@ -1,8 +1,14 @@
 import logging
+import os
+import subprocess
 from pathlib import Path
 import numpy as np
 
+from .. import progress, scheduler, tracing
+from concurrent.futures import as_completed
+
 from pydub import AudioSegment
+from ..tempo import TempoMap
 import platform
 
 def assignFfmpeg(audiosegment:AudioSegment):
@@ -22,66 +28,173 @@ def assignFfmpegBulk(audiosegments:list):
     for audiosegment in audiosegments:
         assignFfmpeg(audiosegment)
 
-def vocalsplit(chart, bpm, origin, path, key, characters):
-    beatLength = (60 / bpm) * 1000
-    stepLength = beatLength / 4
-    sectionLength = beatLength * 4
+def splitQueue(jobs:list, workers:int = None) -> list:
+    """
+    Runs vocalsplit for every queued song on a process pool. Failures are reported once all songs are done.
+
+    Args:
+        jobs (list): Arguments for vocalsplit, one tuple per song.
+        workers (int): Size of the pool. Defaults to the CPU count.
+
+    Returns:
+        list: Keys of the songs that failed.
+    """
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    failed = []
+
+    logging.info(f'Vocal Split: Splitting {len(jobs)} songs on {workers} processes')
+
+    pool = scheduler.makePool(workers, 'process')
+    try:
+        futures = {pool.submit(vocalsplit, *job): job[4] for job in jobs}
+
+        for done, future in enumerate(progress.each(as_completed(futures), len(futures)), 1):
+            key = futures[future]
+            try:
+                future.result()
+                logging.info(f'Vocal Split ({done}/{len(jobs)}): {key} done')
+            except Exception as e:
+                logging.error(f'Vocal Split ({done}/{len(jobs)}): {key} failed: {e}')
+                failed.append(key)
+    finally:
+        # Songs that didn't start yet are dropped if the conversion was cancelled
+        pool.shutdown(cancel_futures=True)
+
+    if len(failed) > 0:
+        logging.error(f'Vocal Split failed for {len(failed)} of {len(jobs)} songs: {", ".join(failed)}')
+    else:
+        logging.info(f'Vocal Split finished for all {len(jobs)} songs')
+
+    return failed
 
+@tracing.traced('audio', 'key')
+def vocalsplit(chart, bpm, origin, path, key, characters, mode = 'ffmpeg'):
     bf = characters[0]
     dad = characters[1]
 
-    songSteps = 0
-    lastSteps = 0
+    # Same timing the chart was converted with
+    tempo = TempoMap.fromSections(bpm, chart)
     sectionDirs = []
 
-    for section in chart:
-        if section.get('changeBPM', False):
-            logging.info(f'{key}: BPM Change ({section.get("bpm")}) at {songSteps} steps')
-            beatLength = (60 / section.get('bpm', 1)) * 1000
-            lastSteps = songSteps
-            songSteps = 0
-            stepLength = beatLength / 4
+    for index, section in enumerate(chart):
+        songTime = tempo.sectionTimes[index]
 
-        songTime = lastSteps + (songSteps * stepLength)
-        mustHit = section['mustHitSection']
-        isDuet = section['isDuet']
+        if section.get('changeBPM', False):
+            logging.info(f'{key}: BPM Change ({section.get("bpm")}) at {tempo.sectionSteps[index]} steps')
 
-        # print('Section at', songTime)
-        # print('Must Hit', mustHit)
-        # print('Duet', isDuet)
+        sectionDirs.append([songTime, section['mustHitSection'], section['isDuet']])
 
-        sectionDirs.append([songTime, mustHit, isDuet])
+    bfMute, opponentMute = muteRanges(sectionDirs)
 
-        songSteps += section.get('lengthInSteps', 16)
+    if mode == 'ffmpeg':
+        try:
+            ffmpegSplit(origin + "Voices.ogg", [(path + f"Voices-{bf}.ogg", bfMute), (path + f"Voices-{dad}.ogg", opponentMute)])
+            return
+        except Exception as e:
+            logging.warn(f'{key}: FFmpeg split failed, decoding it instead: {e}')
 
     assignFfmpegBulk([AudioSegment])
 
     originalVocals = AudioSegment.from_ogg(origin + "Voices.ogg")
-    vocalsBF = AudioSegment.empty()
-    vocalsOpponent = AudioSegment.empty()
 
-    assignFfmpegBulk([vocalsBF, vocalsOpponent])
+    vocalsBF, vocalsOpponent = splitSamples(originalVocals, bfMute, opponentMute)
+    del originalVocals
 
-    arr = np.array(sectionDirs)
+    vocalsBF.export(path + f"Voices-{bf}.ogg", format="ogg")
+    vocalsOpponent.export(path + f"Voices-{dad}.ogg", format="ogg")
 
-    arr = arr[arr[:,0].argsort()]
-    arr = np.vstack([arr, [len(originalVocals), False, False]])
+def muteRanges(sectionDirs:list):
+    """
+    Works out when each side has to be silent. Sections in a row muting the same side are merged.
 
-    for i in range(len(arr) - 1):
-        section_start_time = int(arr[i, 0])
-        next_section_time = int(arr[i + 1, 0])
+    Args:
+        sectionDirs (list): [start time (ms), must hit, is duet] of every section.
 
-        chunk = originalVocals[section_start_time:next_section_time]
-        silence = AudioSegment.silent(duration=len(chunk))
+    Returns:
+        tuple: [start, end] ranges in ms for the player and the opponent. An end of None lasts until the song ends.
+    """
+    sections = sorted(sectionDirs, key=lambda section: section[0])
+    bfMute = []
+    opponentMute = []
 
-        # assignFfmpeg(silence)
+    # Anything before the first section is silent for both
+    if len(sections) == 0:
+        return [[0, None]], [[0, None]]
+    if sections[0][0] > 0:
+        bfMute.append([0, sections[0][0]])
+        opponentMute.append([0, sections[0][0]])
 
-        if arr[i, 2] or arr[i, 1] == False:  # Duet or not must hit
-            vocalsOpponent += chunk
-            vocalsBF += silence
-        else:
-            vocalsBF += chunk
-            vocalsOpponent += silence
+    for i, (section_start_time, mustHit, isDuet) in enumerate(sections):
+        next_section_time = sections[i + 1][0] if i + 1 < len(sections) else None
 
-    vocalsBF.export(path + f"Voices-{bf}.ogg", format="ogg")
-    vocalsOpponent.export(path + f"Voices-{dad}.ogg", format="ogg")
\ No newline at end of file
+        ranges = bfMute if isDuet or mustHit == False else opponentMute  # Duet or not must hit
+
+        if len(ranges) > 0 and ranges[-1][1] == section_start_time:
+            ranges[-1][1] = next_section_time
+        else:
+            ranges.append([section_start_time, next_section_time])
+
+    return bfMute, opponentMute
+
+def ffmpegPath() -> str:
+    """
+    The ffmpeg binary pydub would use, including the one shipped next to the Windows build.
+    """
+    assignFfmpeg(AudioSegment)
+    return AudioSegment.converter
+
+def ffmpegSplit(source:str, outputs:list):
+    """
+    Splits vocals with a single ffmpeg run: the audio is decoded once, each output mutes
+    its ranges with a volume filter and everything is encoded in the same pass.
+
+    Args:
+        source (str): Path to Voices.ogg.
+        outputs (list): (path, mute ranges) for every file to write.
+    """
+    labels = [f'v{i}' for i in range(len(outputs))]
+    filters = [f'[0:a]asplit={len(outputs)}' + ''.join(f'[in{label}]' for label in labels)]
+
+    for label, (_, ranges) in zip(labels, outputs):
+        conditions = [f'gte(t,{start / 1000:.3f})' + (f'*lt(t,{end / 1000:.3f})' if end != None else '') for start, end in ranges]
+
+        if len(conditions) > 0:
+            filters.append(f"[in{label}]volume=0:enable='{'+'.join(conditions)}'[{label}]")
+        else:
+            filters.append(f'[in{label}]anull[{label}]')
+
+    command = [ffmpegPath(), '-y', '-loglevel', 'error', '-i', source, '-filter_complex', ';'.join(filters)]
+    for label, (path, _) in zip(labels, outputs):
+        command.extend(['-map', f'[{label}]', '-acodec', 'libvorbis', '-f', 'ogg', path])
+
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+
+def splitSamples(vocals:AudioSegment, bfMute:list, opponentMute:list):
+    """
+    Splits decoded vocals in two by muting, in place, the ranges the other side sings.
+    Works on one copy of the samples per output instead of rebuilding them section by section.
+
+    Args:
+        vocals (AudioSegment): The decoded Voices.ogg.
+        bfMute (list): Ranges to mute for the player, from muteRanges.
+        opponentMute (list): Ranges to mute for the opponent, from muteRanges.
+
+    Returns:
+        tuple: The player's and the opponent's vocals.
+    """
+    sampleTypes = {1: np.int8, 2: np.int16, 4: np.int32}
+    frameRate = vocals.frame_rate
+
+    opponentSamples = np.frombuffer(vocals.raw_data, dtype=sampleTypes[vocals.sample_width]).reshape(-1, vocals.channels).copy()
+    bfSamples = opponentSamples.copy()
+    frameCount = len(opponentSamples)
+
+    for samples, ranges in [(bfSamples, bfMute), (opponentSamples, opponentMute)]:
+        for start, end in ranges:
+            start = min(int(start * frameRate / 1000), frameCount)
+            end = min(int(end * frameRate / 1000), frameCount) if end != None else frameCount
+            samples[start:end] = 0
+
+    return vocals._spawn(bfSamples.tobytes()), vocals._spawn(opponentSamples.tobytes())
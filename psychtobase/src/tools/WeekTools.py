@@ -1,7 +1,6 @@
-import json
 import logging
 
-from .. import Constants
+from .. import Constants, jsonio
 from copy import deepcopy
 
 def convert(weekJSON, modfolder, week_filename):
@@ -21,11 +20,11 @@ def convert(weekJSON, modfolder, week_filename):
             weekCharJSONStr = ''
             logging.info(f'Opening {char}.json')
             try:
-                weekCharJSONStr = open(modfolder + Constants.FILE_LOCS.get('WEEKCHARACTERJSON')[0] + f'{char}.json').read()
+                weekCharJSONStr = open(modfolder + Constants.FILE_LOCS.get('WEEKCHARACTERJSON')[0] + f'{char}.json', 'rb').read()
             except:
                 logging.error(f'Could not open {char}.json')
                 continue
-            weekCharacterJSON = json.loads(weekCharJSONStr)
+            weekCharacterJSON = jsonio.loads(weekCharJSONStr)
 
             propTemplate = deepcopy(Constants.LEVEL_PROP)
             propTemplate['assetPath'] = Constants.FILE_LOCS.get('WEEKCHARACTERASSET')[1] + weekCharacterJSON['image']
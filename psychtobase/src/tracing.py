@@ -0,0 +1,167 @@
+"""
+Spans timing the parts of a conversion, saved as a Chrome trace event file that chrome://tracing and Perfetto (ui.perfetto.dev) open.
+
+Nothing is recorded unless a conversion was started with the 'profile' option set to the file to write.
+"""
+
+import functools
+import glob
+import inspect
+import logging
+import multiprocessing
+import os
+import threading
+import time
+
+from contextlib import contextmanager
+
+from . import jsonio
+
+settings = {
+	'file': None # Where the trace goes, None when not tracing
+}
+
+# Events of this process. Worker processes also write theirs next to the trace file, see _writePart
+_events = []
+_named = set()
+_local = threading.local()
+
+def configure(file:str = None):
+	"""
+	Turns tracing on (writing to `file`) or off.
+	"""
+	settings['file'] = file
+
+def setupWorker(file:str = None):
+	"""
+	Tracing for worker processes, set up by scheduler.makePool. Forked workers start with a copy of the parent's events,
+	which the parent saves itself, and of the spans it was in.
+	"""
+	configure(file)
+	_events.clear()
+	_named.clear()
+	_local.depth = 0
+
+def start(file:str = None):
+	"""
+	Starts the trace of a conversion, dropping what an earlier one recorded.
+	"""
+	configure(file)
+	_events.clear()
+	_named.clear()
+
+	if file:
+		for part in glob.glob(glob.escape(file) + '.*.part'):
+			os.remove(part)
+
+def _isWorker() -> bool:
+	return multiprocessing.parent_process() != None
+
+def _name(pid:int, tid:int):
+	# Perfetto labels the tracks with these
+	if (pid, tid) in _named:
+		return
+
+	if not any(key[0] == pid for key in _named):
+		_events.append({'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+			'args': {'name': f'Worker {pid}' if _isWorker() else 'FNF Porter'}})
+	_named.add((pid, tid))
+	_events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': threading.current_thread().name}})
+
+def _writePart():
+	# Pool workers exit without atexit, so their events are written out after each top level span
+	global _events
+	events, _events = _events, []
+
+	try:
+		with open(f"{settings['file']}.{os.getpid()}.part", 'ab') as part:
+			for event in events:
+				part.write(jsonio.dumpb(event, compact=True) + b'\n')
+	except OSError as e:
+		logging.warn(f'Could not write trace events: {e}')
+
+@contextmanager
+def span(name:str, category:str = 'convert', **args):
+	"""
+	Times what runs inside the with block.
+
+	Args:
+		name (str): Name of the span, like the stage or the function.
+		category (str): Category of the span, Perfetto can filter by it.
+		args: Shown with the span, like the song or file it worked on.
+	"""
+	if not settings['file']:
+		yield
+		return
+
+	depth = getattr(_local, 'depth', 0)
+	_local.depth = depth + 1
+	begin = time.perf_counter_ns()
+
+	try:
+		yield
+	finally:
+		end = time.perf_counter_ns()
+		_local.depth = depth
+
+		pid, tid = os.getpid(), threading.get_ident()
+		_name(pid, tid)
+		event = {'name': name, 'cat': category, 'ph': 'X', 'ts': begin / 1000, 'dur': (end - begin) / 1000, 'pid': pid, 'tid': tid}
+		if args:
+			event['args'] = {key: str(value) for key, value in args.items()}
+		_events.append(event)
+
+		if depth == 0 and _isWorker():
+			_writePart()
+
+def traced(category:str = 'convert', *shown:str):
+	"""
+	Decorator timing every call of a function as a span named after it.
+
+	Args:
+		category (str): Category of the spans.
+		shown (str): Names of the arguments shown with the spans, like the path of the file it works on.
+	"""
+	def decorate(function):
+		name = function.__qualname__
+		signature = inspect.signature(function)
+
+		@functools.wraps(function)
+		def wrapper(*args, **kwargs):
+			if not settings['file']:
+				return function(*args, **kwargs)
+
+			arguments = signature.bind_partial(*args, **kwargs).arguments
+			with span(name, category, **{key: arguments.get(key) for key in shown}):
+				return function(*args, **kwargs)
+		return wrapper
+	return decorate
+
+def save() -> str:
+	"""
+	Writes the trace of the conversion, with the events of the worker processes.
+
+	Returns:
+		str: Path of the trace, None when not tracing.
+	"""
+	file = settings['file']
+	if not file:
+		return None
+
+	events = list(_events)
+	for part in glob.glob(glob.escape(file) + '.*.part'):
+		try:
+			with open(part, 'rb') as f:
+				events.extend(jsonio.loads(line) for line in f if line.strip())
+			os.remove(part)
+		except (OSError, ValueError) as e:
+			logging.warn(f'Could not read trace events from {part}: {e}')
+
+	try:
+		jsonio.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file, compact=True)
+	except OSError as e:
+		logging.error(f'Could not write the trace to {file}: {e}')
+		return None
+
+	logging.info(f'Trace with {len(events)} events written to {file}')
+	return file
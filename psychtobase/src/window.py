@@ -7,13 +7,13 @@ import platform
 import subprocess
 import webbrowser
 
-from . import log, Constants
+from . import log, progress, Constants
 from base64 import b64decode
 from pathlib import Path
 
-from PyQt6.QtCore import QSize
+from PyQt6.QtCore import QSize, QThread, QTimer, pyqtSignal
 from PyQt6.QtGui import QIcon, QImage, QPixmap
-from PyQt6.QtWidgets import QApplication, QCheckBox, QDialog, QFileDialog, QLabel, QLineEdit, QMainWindow, QPushButton, QRadioButton, QTextBrowser, QVBoxLayout
+from PyQt6.QtWidgets import QApplication, QCheckBox, QDialog, QFileDialog, QLabel, QLineEdit, QMainWindow, QPlainTextEdit, QProgressBar, QPushButton, QRadioButton, QVBoxLayout
 
 icon = b64decode(Constants.BASE64_IMAGES.get('windowIcon'))
 
@@ -110,8 +110,37 @@ class ErrorMessage(QDialog):
 	def on_button_clicked(self):
 		self.close()
 		
+class ConversionWorker(QThread):
+	"""
+	Runs main.convert off the GUI thread, so the window keeps responding and the conversion can be cancelled.
+	"""
+	progressed = pyqtSignal(dict)
+	completed = pyqtSignal(bool) # False if it was cancelled or crashed
+
+	def __init__(self, psych_mod_folder_path, result_path, options):
+		super().__init__()
+		self.args = (psych_mod_folder_path, result_path, options)
+		# Progress calls back on the converting threads, the signal hands it to the window
+		self.progress = progress.Progress(self.progressed.emit)
+
+	def run(self):
+		completed = False
+		try:
+			completed = main.convert(*self.args, self.progress)
+		except Exception as e:
+			logging.error(f'Conversion failed: {e}')
+		self.completed.emit(completed)
+
+	def cancel(self):
+		logging.info('Cancelling the conversion...')
+		self.progress.cancel()
+
 class Window(QMainWindow):
 	def closeEvent(self, event):
+		if self.worker != None and self.worker.isRunning():
+			# Stops at the next file, the stage being written isn't left half done
+			self.worker.cancel()
+			self.worker.wait()
 		logging.info('Thanks for using FNF Porter!')
 		#time.sleep(0.1)
 		event.accept()
@@ -209,10 +238,17 @@ class Window(QMainWindow):
 		self.ohioSkibidi.resize(100, 30)
 		self.ohioSkibidi.clicked.connect(self.openLogFile)
 
-		self.logsLabel = QTextBrowser(self)
+		self.logsLabel = QPlainTextEdit(self)
+		self.logsLabel.setReadOnly(True)
+		self.logsLabel.setMaximumBlockCount(log.WINDOW_LINES) # Oldest lines go first
 		self.logsLabel.move(20, 360)
 		self.logsLabel.resize(320, 270)
 
+		# New log lines are added in one go every so often, instead of laying out the view again for each record
+		self.logTimer = QTimer(self)
+		self.logTimer.timeout.connect(self.showLogs)
+		self.logTimer.start(100)
+
 		self.helpButton = QPushButton("Report an issue", self)
 		self.helpButton.setToolTip('https://github.com/gusborg88/fnf-porter/issues/new/choose/')
 		self.helpButton.move(130, 320)
@@ -372,6 +408,21 @@ class Window(QMainWindow):
 		self.convert.move((self.width() - 20) - self.convert.width(), (self.height() - 20) - self.convert.height())
 		self.convert.clicked.connect(self.convertCallback)
 
+		self.cancel = QPushButton("Cancel", self)
+		self.cancel.move(self.convert.x() - 10 - self.cancel.width(), self.convert.y())
+		self.cancel.setEnabled(False)
+		self.cancel.clicked.connect(self.cancelCallback)
+
+		self.progressBar = QProgressBar(self)
+		self.progressBar.move(sX, self.convert.y())
+		self.progressBar.resize(self.cancel.x() - 10 - sX, self.convert.height())
+
+		self.progressLabel = QLabel("", self)
+		self.progressLabel.move(sX, self.convert.y() - 30)
+		self.progressLabel.resize(wid - 20 - sX, 30)
+
+		self.worker = None
+
 		self.radioCheck(True, True)
 
 	def allToDefaults(self, checked = True, enabled = False):
@@ -548,14 +599,58 @@ class Window(QMainWindow):
 			self.throwError(f'Problems on your save file! {e}')
 
 		if psych_mod_folder_path != None and result_path != None:
-			# try:
-				main.convert(psych_mod_folder_path, result_path, options)
-			# except Exception as e:
-				# self.throwError('Exception ocurred', f'{e}')
-				# This is kinda(?) unfinished
+			if self.worker != None and self.worker.isRunning():
+				logging.warn('A conversion is already running!')
+				return
+
+			self.worker = ConversionWorker(psych_mod_folder_path, result_path, options)
+			self.worker.progressed.connect(self.showProgress)
+			self.worker.completed.connect(self.conversionDone)
+
+			self.convert.setEnabled(False)
+			self.cancel.setEnabled(True)
+			self.progressBar.setValue(0)
+			self.progressLabel.setText('Starting...')
+
+			self.worker.start()
 		else:
 			logging.warn('Select an input folder or output folder first!')
 
+	def showLogs(self):
+		lines = log.drainWindowLines()
+		if lines:
+			self.logsLabel.appendPlainText('\n'.join(lines))
+
+	def cancelCallback(self):
+		if self.worker != None and self.worker.isRunning():
+			self.cancel.setEnabled(False)
+			self.progressLabel.setText('Cancelling...')
+			self.worker.cancel()
+
+	def showProgress(self, snapshot):
+		if snapshot['cancelled']:
+			return
+
+		done = snapshot['filesDone']
+		total = max(snapshot['filesTotal'], done)
+
+		self.progressBar.setMaximum(max(total, 1))
+		self.progressBar.setValue(done)
+		stage = min(snapshot['stagesDone'] + 1, snapshot['stagesTotal'])
+		self.progressLabel.setText(f"Stage {stage}/{snapshot['stagesTotal']} ({snapshot['stage'] or '...'}): {done}/{total} files, {snapshot['bytesCopied'] / 1048576:.1f} MB copied")
+
+	def conversionDone(self, completed):
+		self.convert.setEnabled(True)
+		self.cancel.setEnabled(False)
+
+		if completed:
+			self.progressBar.setValue(self.progressBar.maximum())
+			self.progressLabel.setText('Conversion done!')
+		elif self.worker.progress.cancelled():
+			self.progressLabel.setText('Conversion cancelled.')
+		else:
+			self.progressLabel.setText('Conversion failed, check the log file.')
+
 	def goToIssues(self):
 		webbrowser.open('https://github.com/gusborg88/fnf-porter/issues/new/choose')
 
@@ -564,6 +659,7 @@ class Window(QMainWindow):
 		webbrowser.open(f'https://gamebanana.com/tools/{_GB_ToolID}')
 
 	def openLogFile(self):
+		log.flush()
 		file = log.logMemory.current_log_file
 		realLogPath = Path(file).resolve()
 		print(realLogPath)
@@ -0,0 +1,6 @@
+import sys
+
+from pathlib import Path
+
+# main.py and src/ import each other as top-level modules, like in psychtobase/__main__.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'psychtobase'))
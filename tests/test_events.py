@@ -0,0 +1,21 @@
+from src.tools.EventTools import EventConverter
+
+def test_malformed_stacked_events_are_skipped():
+	events = []
+	EventConverter(events).convert([
+		[100, [[], 'Play Animation', 5, None, [['Play Animation'], 'hey', 'bf'], ['Play Animation', 'hey', 'bf']]],
+		[200, [['Play Animation']]],
+		[300, 'not a list'],
+		[400, [['Change Character', 'dad', 'pico']]]
+	])
+
+	assert [(event['t'], event['e']) for event in events] == [(100, 'PlayAnimation'), (400, 'Change Character')]
+
+def test_same_event_added_once():
+	events = []
+	converter = EventConverter(events)
+	converter.convert([[100, [['Play Animation', 'hey', '0'], ['Play Animation', 'hey', 'BF']]]])
+	converter.convert([[100, [['Play Animation', 'hey', 'bf']]]])
+
+	assert len(events) == 1
+	assert events[0]['v']['target'] == 'bf'
@@ -0,0 +1,34 @@
+import os
+
+from src import files
+
+def test_copyFile_same_file_keeps_source(tmp_path):
+    source = tmp_path / 'song.ogg'
+    source.write_bytes(b'audio')
+
+    for skip in [None, 'stat', 'hash']:
+        assert files.copyFile(str(source), str(source), skip=skip) == 'skipped'
+        assert source.read_bytes() == b'audio'
+
+def test_copyFile_same_file_through_other_path(tmp_path):
+    source = tmp_path / 'mod' / 'song.ogg'
+    source.parent.mkdir()
+    source.write_bytes(b'audio')
+
+    # The output folder is the mod folder, reached through another path
+    assert files.copyFile(str(source), str(tmp_path / 'mod' / '.' / 'song.ogg'), skip=None) == 'skipped'
+    assert source.read_bytes() == b'audio'
+
+def test_copyFile_replaces_stale_hardlink(tmp_path):
+    old = tmp_path / 'old.ogg'
+    old.write_bytes(b'old')
+    destination = tmp_path / 'out.ogg'
+    os.link(old, destination)
+
+    source = tmp_path / 'new.ogg'
+    source.write_bytes(b'new audio')
+
+    assert files.copyFile(str(source), str(destination), mode='copy', skip=None) == 'copied'
+    assert destination.read_bytes() == b'new audio'
+    # Written to a new file, not through the link
+    assert old.read_bytes() == b'old'
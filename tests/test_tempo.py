@@ -0,0 +1,60 @@
+import pytest
+
+from src.tempo import TempoMap
+
+def song():
+	# 120 BPM (125ms steps), then 240 BPM (62.5ms steps) from the second section, 16 steps each
+	return TempoMap.fromSections(120, [
+		{'lengthInSteps': 16},
+		{'lengthInSteps': 16, 'changeBPM': True, 'bpm': 240},
+		{'lengthInSteps': 16},
+		{'lengthInSteps': 16, 'changeBPM': False, 'bpm': 60}
+	])
+
+def test_section_times():
+	tempo = song()
+	assert tempo.sectionSteps == [0, 16, 32, 48]
+	assert tempo.sectionTimes == [0, 2000, 3000, 4000]
+
+def test_msAtStep_across_change():
+	tempo = song()
+	assert tempo.msAtStep(8) == 1000
+	assert tempo.msAtStep(16) == 2000
+	assert tempo.msAtStep(24) == 2500
+	assert tempo.msAtStep(48) == 4000
+
+def test_stepAtMs_across_change():
+	tempo = song()
+	assert tempo.stepAtMs(1000) == 8
+	assert tempo.stepAtMs(2000) == 16
+	assert tempo.stepAtMs(1875) == 15
+	assert tempo.stepAtMs(2062.5) == 17
+	# Before the song, at the starting BPM
+	assert tempo.stepAtMs(-125) == -1
+
+@pytest.mark.parametrize('step', [0, 5.5, 15.9, 16, 16.1, 31, 47.25, 80])
+def test_stepAtMs_inverts_msAtStep(step):
+	tempo = song()
+	assert tempo.stepAtMs(tempo.msAtStep(step)) == pytest.approx(step)
+
+def test_sectionAtMs_boundaries():
+	tempo = song()
+	assert tempo.sectionAtMs(-10) == 0
+	assert tempo.sectionAtMs(0) == 0
+	assert tempo.sectionAtMs(1999.9) == 0
+	assert tempo.sectionAtMs(2000) == 1
+	assert tempo.sectionAtMs(2999.9) == 1
+	assert tempo.sectionAtMs(3000) == 2
+	assert tempo.sectionAtMs(10000) == 3
+
+def test_sectionAtMs_without_sections():
+	assert TempoMap(150).sectionAtMs(0) == -1
+
+def test_change_replaced_when_nothing_played():
+	tempo = TempoMap(120)
+	tempo.addSection(0, 200)
+	tempo.addSection(16, 240)
+
+	assert tempo.changeSteps == [0]
+	assert tempo.bpms == [240]
+	assert tempo.msAtStep(16) == 1000